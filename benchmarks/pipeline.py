@@ -0,0 +1,211 @@
+# End-to-end benchmark of the MUS2MUC pipeline: runs mus2muc on every
+# instance, in a fresh process, and writes the measures to a JSON file.
+#
+#   python -m benchmarks.pipeline --bin-folder bin/ -o results.json specs/ -- -t 60
+#
+# Arguments after `--` are passed to mus2muc. With --record DIR, the calls to
+# gringo, wasp and aaltaf are recorded in DIR; with --replay DIR, they are
+# replayed from DIR by the executables of benchmarks/stubs, so that the
+# overhead of the pipeline is measured without the solvers.
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any
+
+from benchmarks.replay import STUBS
+from mus2muc.batch import list_instances
+from mus2muc.enumeration import LTLF2ASP_ENCODING_PATH
+from mus2muc.generators import Grounder
+from mus2muc.ltlf_parser import compose_probe_program
+
+MUS2MUC = "import sys; from mus2muc.cli import main; sys.argv[0] = 'mus2muc'; main()"
+
+
+def revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def latency_summary(latencies: list[float]) -> dict[str, Any]:
+    if len(latencies) == 0:
+        return {"count": 0}
+
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+
+def measure_events(events: list[dict[str, Any]], elapsed: float) -> dict[str, Any]:
+    # Measures from the verbose output of a run. The first GENERATOR_RESTART
+    # event is the start of the enumeration, not a restart.
+    mucs = [e for e in events if e["event"] == "FOUND_MUC"]
+    certified = [e for e in events if e["event"] in ("FOUND_MUC", "NOT_A_MUC")]
+    horizons = [e["k"] for e in events if e["event"] == "GENERATOR_RESTART"]
+
+    return {
+        "mucs": len(mucs),
+        "muses": sum(1 for e in events if e["event"] == "FOUND_MUS"),
+        "not_mucs": sum(1 for e in events if e["event"] == "NOT_A_MUC"),
+        "unknown": sum(1 for e in events if e["event"] == "UNKNOWN_MUS"),
+        "restarts": max(0, len(horizons) - 1),
+        "horizons": horizons,
+        "time_to_first_muc": (
+            min(e["timestamps"]["certified"] for e in mucs) if len(mucs) > 0 else None
+        ),
+        "mucs_per_second": len(mucs) / elapsed if elapsed > 0 else None,
+        "certifier_latency": latency_summary(
+            [e["core-compute-time"] for e in certified]
+        ),
+    }
+
+
+def measure_grounding(instance: Path, horizons: list[int]) -> dict[str, float]:
+    # gringo is timed apart from the run, once per horizon the run reached,
+    # on the in-memory probe program.
+    grounder = Grounder(
+        compose_probe_program(instance.read_text(), LTLF2ASP_ENCODING_PATH)
+    )
+    timings = {}
+    with open(os.devnull, "wb") as sink:
+        for k in sorted(set(horizons)):
+            timings[str(k)] = grounder.stream(k, sink)
+    return timings
+
+
+def run_instance(
+    instance: Path, bin_folder: Path, mus2muc_args: list[str], env: dict[str, str]
+) -> dict[str, Any]:
+    with TemporaryDirectory() as workdir:
+        output = Path(workdir) / "events.jsonl"
+        command = [
+            sys.executable,
+            "-c",
+            MUS2MUC,
+            instance.as_posix(),
+            "--bin-folder",
+            bin_folder.as_posix(),
+            "-v",
+            "--output",
+            output.as_posix(),
+            *mus2muc_args,
+        ]
+
+        start = perf_counter()
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=env,
+        )
+        # wait4 reports the peak RSS of mus2muc and of the processes it
+        # waited for: wasp runners, solvers and gringo.
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+        events = []
+        if output.is_file():
+            events = [json.loads(x) for x in output.read_text().splitlines() if x]
+
+    result = {
+        "instance": instance.as_posix(),
+        "exit_code": process.returncode,
+        "elapsed": elapsed,
+        "peak_rss_mb": usage.ru_maxrss / 1024,
+    }
+    result.update(measure_events(events, elapsed))
+    return result
+
+
+def main():
+    parser = ArgumentParser(prog="pipeline")
+    parser.add_argument(
+        "instances", type=Path, nargs="+", help="Instances, folders or manifests."
+    )
+    parser.add_argument("--bin-folder", type=Path, default=Path("bin"))
+    parser.add_argument("-o", "--output", type=Path, default=Path("benchmark.json"))
+    parser.add_argument("--repeat", type=int, default=1)
+    replay = parser.add_mutually_exclusive_group()
+    replay.add_argument("--record", type=Path, metavar="DIR")
+    replay.add_argument("--replay", type=Path, metavar="DIR")
+    parser.add_argument(
+        "--no-grounding",
+        action="store_true",
+        help="Do not time gringo apart from the runs.",
+    )
+
+    argv = sys.argv[1:]
+    mus2muc_args = []
+    if "--" in argv:
+        mus2muc_args = argv[argv.index("--") + 1 :]
+        argv = argv[: argv.index("--")]
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    bin_folder = args.bin_folder.resolve()
+    if args.record is not None or args.replay is not None:
+        env["MUS2MUC_REPLAY_DIR"] = (args.record or args.replay).resolve().as_posix()
+        env["PATH"] = STUBS.as_posix() + os.pathsep + env.get("PATH", "")
+        if args.record is not None:
+            env["MUS2MUC_RECORD_FROM"] = bin_folder.as_posix()
+        bin_folder = STUBS
+        # Grounding is timed through the stubs as well.
+        os.environ.update(env)
+
+    instances = []
+    for source in args.instances:
+        instances += (
+            [source] if source.suffix == ".ltlfconj" else list_instances(source)
+        )
+
+    runs = []
+    for instance in instances:
+        for repetition in range(args.repeat):
+            result = run_instance(instance, bin_folder, mus2muc_args, env)
+            result["repetition"] = repetition
+            if not args.no_grounding:
+                result["grounding_time"] = measure_grounding(
+                    instance, result["horizons"]
+                )
+            runs.append(result)
+            print(
+                f"{instance.name} #{repetition}: exit {result['exit_code']}, "
+                f"{result['mucs']} MUCs in {result['elapsed']:.2f}s, "
+                f"{result['restarts']} restarts, {result['peak_rss_mb']:.0f} MB",
+                flush=True,
+            )
+
+    report = {
+        "revision": revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mus2muc_args": mus2muc_args,
+        "mode": "record" if args.record else "replay" if args.replay else "live",
+        "runs": runs,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
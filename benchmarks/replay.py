@@ -0,0 +1,129 @@
+# Record and replay of the external solvers, behind the executables of
+# benchmarks/stubs. Each call is keyed by the hash of the tool name, its
+# arguments and its input (files named in the arguments are hashed by
+# content, since probe files carry the pid in their name).
+#
+#   MUS2MUC_REPLAY_DIR   folder of the recordings, required.
+#   MUS2MUC_RECORD_FROM  folder of the real executables. When set, the real
+#                        tool is run and its output is recorded as well as
+#                        forwarded; tools missing from the folder are looked
+#                        up on PATH, without the stubs folder.
+#
+# A replayed call prints the recorded output at once: the time measured by
+# the pipeline is its own overhead, not the solvers'.
+import json
+import os
+import shutil
+import sys
+from hashlib import sha256
+from pathlib import Path
+from subprocess import PIPE, Popen
+from threading import Thread
+
+STUBS = Path(__file__).resolve().parent / "stubs"
+
+
+def call_key(tool: str, args: list[str], stdin: bytes) -> str:
+    digest = sha256(tool.encode("utf-8"))
+    for arg in args:
+        path = Path(arg)
+        digest.update(b"\0")
+        digest.update(path.read_bytes() if path.is_file() else arg.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(stdin)
+    return digest.hexdigest()
+
+
+def real_executable(tool: str, record_from: Path) -> str:
+    if (record_from / tool).is_file():
+        return (record_from / tool).as_posix()
+
+    path = os.pathsep.join(
+        x
+        for x in os.environ.get("PATH", "").split(os.pathsep)
+        if Path(x).resolve() != STUBS
+    )
+    executable = shutil.which(tool, path=path)
+    if executable is None:
+        sys.exit(f"{tool}: no real executable to record from")
+    return executable
+
+
+def record(
+    tool: str, args: list[str], stdin: bytes, recording: Path, record_from: Path
+):
+    # The output is forwarded as it is produced, since the pipeline reads
+    # wasp's MUSes while it runs. If the caller stops reading (the generator
+    # was restarted), what was seen so far is recorded: a replay is stopped
+    # at the same point.
+    process = Popen(
+        [real_executable(tool, record_from), *args],
+        stdin=PIPE,
+        stdout=PIPE,
+        stderr=PIPE,
+    )
+    stderr = []
+    reader = Thread(target=lambda: stderr.append(process.stderr.read()), daemon=True)
+    reader.start()
+    Thread(target=__feed__, args=(process, stdin), daemon=True).start()
+
+    stdout = bytearray()
+    try:
+        while chunk := os.read(process.stdout.fileno(), 65536):
+            stdout += chunk
+            sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+    except BrokenPipeError:
+        process.kill()
+
+    returncode = process.wait()
+    reader.join()
+    recording.parent.mkdir(parents=True, exist_ok=True)
+    recording.with_suffix(".out").write_bytes(bytes(stdout))
+    recording.with_suffix(".json").write_text(
+        json.dumps(
+            {
+                "returncode": returncode,
+                "stderr": b"".join(stderr).decode("utf-8", errors="replace"),
+            }
+        )
+    )
+    return returncode, b"".join(stderr)
+
+
+def __feed__(process: Popen, stdin: bytes):
+    try:
+        process.stdin.write(stdin)
+        process.stdin.close()
+    except (BrokenPipeError, ValueError):
+        pass
+
+
+def main(tool: str):
+    replay_dir = os.environ.get("MUS2MUC_REPLAY_DIR")
+    if replay_dir is None:
+        sys.exit(f"{tool}: MUS2MUC_REPLAY_DIR is not set")
+
+    args = sys.argv[1:]
+    # gringo is given the probe file, and reads its stdin only for "-".
+    reads_stdin = tool != "gringo" or "-" in args
+    stdin = sys.stdin.buffer.read() if reads_stdin else b""
+    recording = Path(replay_dir) / tool / call_key(tool, args, stdin)
+
+    record_from = os.environ.get("MUS2MUC_RECORD_FROM")
+    if record_from is not None:
+        returncode, stderr = record(tool, args, stdin, recording, Path(record_from))
+        sys.stderr.buffer.write(stderr)
+        sys.exit(returncode)
+
+    if not recording.with_suffix(".json").is_file():
+        sys.exit(f"{tool}: no recording {recording.name}")
+
+    meta = json.loads(recording.with_suffix(".json").read_text())
+    try:
+        sys.stdout.buffer.write(recording.with_suffix(".out").read_bytes())
+        sys.stdout.buffer.flush()
+    except BrokenPipeError:
+        pass
+    sys.stderr.write(meta["stderr"])
+    sys.exit(meta["returncode"])
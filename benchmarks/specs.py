@@ -0,0 +1,92 @@
+# Generator of synthetic conjunctive LTLf specifications, with a known set of
+# MUCs.
+#
+#   python -m benchmarks.specs specs/ --conjuncts 60 --depth 3 --atoms 8 --cores 4
+#
+# Each planted core of size s is a chain over fresh atoms c_0 ... c_{s-2}:
+#
+#   G(c_0), G(c_0 -> c_1), ..., G(c_{s-3} -> c_{s-2}), F(!c_{s-2})
+#
+# which is unsatisfiable, and satisfiable without any one of its conjuncts.
+# The other conjuncts are random formulas of the given nesting depth over
+# the atoms p_0 ... p_{atoms-1}, without negation and without X: all of them
+# hold on the trace of length 1 where every p_i is true. The MUCs of the
+# specification are then exactly the planted cores.
+import random
+from argparse import ArgumentParser
+from itertools import pairwise
+from pathlib import Path
+
+FILLER_OPERATORS = ["&", "|", "U", "F", "G"]
+
+
+def filler_formula(rng: random.Random, depth: int, atoms: int) -> str:
+    if depth == 0:
+        return f"p{rng.randrange(atoms)}"
+
+    op = rng.choice(FILLER_OPERATORS)
+    if op in ("F", "G"):
+        return f"{op}({filler_formula(rng, depth - 1, atoms)})"
+
+    lhs = filler_formula(rng, depth - 1, atoms)
+    rhs = filler_formula(rng, rng.randrange(depth), atoms)
+    return f"({lhs}) {op} ({rhs})"
+
+
+def planted_core(index: int, size: int) -> list[str]:
+    chain = [f"c{index}_{j}" for j in range(size - 1)]
+    return (
+        [f"G({chain[0]})"]
+        + [f"G({a} -> {b})" for a, b in pairwise(chain)]
+        + [f"F(!{chain[-1]})"]
+    )
+
+
+def make_spec(
+    conjuncts: int, depth: int, atoms: int, cores: int, core_size: int, seed: int
+) -> str:
+    if core_size < 2:
+        raise ValueError("Planted cores have at least 2 conjuncts.")
+    if cores * core_size > conjuncts:
+        raise ValueError("The planted cores do not fit in the number of conjuncts.")
+
+    rng = random.Random(seed)
+    formulas = [f for i in range(cores) for f in planted_core(i, core_size)]
+    formulas += [
+        filler_formula(rng, depth, atoms) for _ in range(conjuncts - len(formulas))
+    ]
+    rng.shuffle(formulas)
+    return "".join(f"P{i} := {f};\n" for i, f in enumerate(formulas))
+
+
+def main():
+    parser = ArgumentParser(prog="specs")
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--conjuncts", type=int, default=40)
+    parser.add_argument(
+        "--depth", type=int, default=2, help="Nesting depth of the random conjuncts."
+    )
+    parser.add_argument("--atoms", type=int, default=6)
+    parser.add_argument(
+        "--cores", type=int, default=3, help="Number of planted unsatisfiable cores."
+    )
+    parser.add_argument("--core-size", type=int, default=3)
+    parser.add_argument("--instances", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    for seed in range(args.seed, args.seed + args.instances):
+        name = (
+            f"synthetic_c{args.conjuncts}_d{args.depth}_a{args.atoms}"
+            f"_u{args.cores}x{args.core_size}_s{seed}.ltlfconj"
+        )
+        spec = make_spec(
+            args.conjuncts, args.depth, args.atoms, args.cores, args.core_size, seed
+        )
+        (args.output_dir / name).write_text(spec)
+        print(args.output_dir / name)
+
+
+if __name__ == "__main__":
+    main()
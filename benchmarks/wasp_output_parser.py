@@ -0,0 +1,59 @@
+# Micro-benchmark of the wasp MUS line parsers: clingo.parse_term on every
+# atom, against WaspOutputParser on raw bytes.
+#
+#   python benchmarks/wasp_output_parser.py --conjuncts 500 --lines 2000
+import random
+from argparse import ArgumentParser
+from timeit import repeat
+
+from mus2muc.generators.wasp_output import WaspOutputParser, parse_mus_line
+from mus2muc.interfaces import ConjunctMapping
+
+
+def make_lines(conjuncts: int, lines: int, max_size: int, seed: int):
+    rng = random.Random(seed)
+    labels = [f"P{i}" for i in range(conjuncts)]
+    # A few labels that need escaping, to exercise the fallback.
+    labels[: conjuncts // 100] = [f'P"{i}' for i in range(conjuncts // 100)]
+    mapping = ConjunctMapping({x: "true" for x in labels})
+
+    output = []
+    for n in range(lines):
+        mus = rng.sample(labels, rng.randint(1, max_size))
+        atoms = " ".join('__mus__("{}")'.format(x.replace('"', '\\"')) for x in mus)
+        output.append(f"[MUS #{n + 1}] {rng.randint(0, 5000)}: {atoms}".encode("ascii"))
+    return mapping, output
+
+
+def main():
+    parser = ArgumentParser(prog="wasp_output_parser")
+    parser.add_argument("--conjuncts", type=int, default=500)
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--max-size", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mapping, lines = make_lines(args.conjuncts, args.lines, args.max_size, args.seed)
+
+    def parse_term_parser():
+        return [parse_mus_line(x.decode("ascii"), 1, mapping) for x in lines]
+
+    def bytes_parser():
+        wasp_parser = WaspOutputParser(mapping)
+        return [wasp_parser.parse(x, 1) for x in lines]
+
+    expected = [x.conjuncts for x in parse_term_parser()]
+    assert [x.conjuncts for x in bytes_parser()] == expected
+
+    atoms = sum(x.bit_count() for x in expected)
+    for name, fn in [("parse_term", parse_term_parser), ("bytes", bytes_parser)]:
+        best = min(repeat(fn, number=1, repeat=args.repeat))
+        print(
+            f"{name:>10}: {best * 1000:8.2f} ms for {len(lines)} lines, "
+            f"{best / atoms * 1e9:7.1f} ns/atom"
+        )
+
+
+if __name__ == "__main__":
+    main()
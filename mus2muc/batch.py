@@ -0,0 +1,181 @@
+import json
+import os
+import signal
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from time import perf_counter
+
+from mus2muc.cli import (
+    add_engine_arguments,
+    check_dependencies,
+    external_certifiers,
+    options_from_args,
+    run,
+)
+from mus2muc.enumeration.mus2muc import MUS2MUCResult
+from mus2muc.interfaces import Options, OutputFormat
+
+
+class InstanceTimeout(Exception):
+    pass
+
+
+def list_instances(source: Path) -> list[Path]:
+    # A folder is searched recursively for .ltlfconj files; any other file is
+    # a manifest listing one instance per line, relative to the manifest.
+    if source.is_dir():
+        return sorted(source.rglob("*.ltlfconj"))
+
+    instances = []
+    for line in source.read_text().splitlines():
+        line = line.strip()
+        if len(line) > 0 and not line.startswith("#"):
+            instances.append(source.parent / line)
+    return instances
+
+
+def output_names(source: Path, instances: list[Path]) -> list[Path]:
+    # Outputs mirror the paths of the instances relative to the folder, or to
+    # the manifest; instances outside of it are named after their file.
+    root = source if source.is_dir() else source.parent
+    names = []
+    for instance in instances:
+        try:
+            name = instance.relative_to(root)
+        except ValueError:
+            name = Path(instance.name)
+        names.append(name.with_suffix(""))
+
+    duplicates = sorted({x.as_posix() for x in names if names.count(x) > 1})
+    if len(duplicates) > 0:
+        raise ValueError(f"Instances would share their output: {', '.join(duplicates)}")
+    return names
+
+
+def error_summary(instance: Path, error: Exception, elapsed: float):
+    return {
+        "instance": instance.as_posix(),
+        "exit_code": MUS2MUCResult.SOME_ERROR,
+        "error": repr(error),
+        "elapsed": elapsed,
+    }
+
+
+def __on_alarm__(signum, frame):
+    raise InstanceTimeout()
+
+
+def run_instance(options: Options, hard_timeout: int | None):
+    # Runs in a pool worker. The engine enforces the total timeout by itself;
+    # the alarm only interrupts an instance that overruns it, for example
+    # while waiting on a stuck generator.
+    start = perf_counter()
+    if hard_timeout is not None:
+        signal.signal(signal.SIGALRM, __on_alarm__)
+        signal.alarm(hard_timeout)
+
+    try:
+        exit_code = run(options)
+    except InstanceTimeout:
+        exit_code = MUS2MUCResult.TIMEOUT
+    except Exception as e:
+        return error_summary(options.input_formula, e, perf_counter() - start)
+    finally:
+        if hard_timeout is not None:
+            signal.alarm(0)
+
+    return {
+        "instance": options.input_formula.as_posix(),
+        "exit_code": int(exit_code),
+        "elapsed": perf_counter() - start,
+    }
+
+
+def main():
+    parser = ArgumentParser(prog="mus2muc-batch")
+    parser.add_argument(
+        "instances",
+        type=Path,
+        help="Folder of .ltlfconj files, or manifest listing one instance per line.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        required=True,
+        help="Folder where the JSONL output of each instance is written.",
+    )
+    parser.add_argument(
+        "--cores",
+        type=int,
+        help="Number of cores shared by all the instances running at once.",
+        default=os.cpu_count(),
+    )
+    parser.add_argument(
+        "--grace-period",
+        type=int,
+        help="Seconds an instance may overrun --total-timeout before it is interrupted.",
+        default=10,
+    )
+    add_engine_arguments(parser)
+    args = parser.parse_args()
+
+    instances = list_instances(args.instances)
+    if len(instances) == 0:
+        print("No instances found.", file=sys.stderr)
+        sys.exit(0)
+
+    try:
+        names = output_names(args.instances, instances)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+
+    suffix = ".bin" if args.output_format == OutputFormat.BINARY else ".jsonl"
+    failures = 0
+    all_options = []
+    for instance, name in zip(instances, names, strict=True):
+        output_file = args.output_dir / f"{name}{suffix}"
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            all_options.append(
+                options_from_args(
+                    args,
+                    instance,
+                    output_file,
+                    metrics_file=(
+                        args.output_dir / f"{name}.prom" if args.metrics_file else None
+                    ),
+                )
+            )
+        except (ValueError, RuntimeError, FileNotFoundError) as e:
+            # Reported as the summary of the instance, so that the others run.
+            failures += 1
+            print(json.dumps(error_summary(instance, e, 0.0)), flush=True)
+
+    if len(all_options) == 0:
+        sys.exit(1)
+
+    first = all_options[0]
+    check_dependencies(
+        external_certifiers(first), first.generator_type, first.bin_folder
+    )
+
+    # Each instance keeps busy its certifiers and its wasp processes.
+    cores_per_instance = first.certifier_workers + first.ensemble_width
+    workers = max(1, args.cores // cores_per_instance)
+    hard_timeout = (
+        first.total_timeout + args.grace_period
+        if first.total_timeout is not None
+        else None
+    )
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_instance, x, hard_timeout) for x in all_options]
+        for future in as_completed(futures):
+            summary = future.result()
+            failures += summary["exit_code"] == MUS2MUCResult.SOME_ERROR
+            print(json.dumps(summary), flush=True)
+
+    sys.exit(1 if failures > 0 else 0)
@@ -0,0 +1,71 @@
+import sqlite3
+from hashlib import sha256
+from pathlib import Path
+from threading import Lock
+
+from mus2muc.interfaces import ConjunctMapping, MUCStatus
+from mus2muc.interfaces.model import iterate_bits
+from mus2muc.ltlf_parser import parse_formula_as_object
+
+
+class CertificationCache:
+    # Persistent store of certifier answers, shared across runs. Entries are
+    # keyed by the hash of the sorted, canonically printed formulas of the
+    # conjuncts, so that they survive label renamings and conjunct
+    # reorderings. Only definitive answers are stored: the status, and the
+    # witness length of satisfiable sets.
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS certifications (
+            key TEXT PRIMARY KEY,
+            status INTEGER NOT NULL,
+            witness_length INTEGER
+        )
+    """
+
+    def __init__(self, path: Path, mapping: ConjunctMapping):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.execute(self.SCHEMA)
+        self.connection.commit()
+        self.lock = Lock()
+        # Canonical formulas, by conjunct id.
+        self.canonical: list[str] = [
+            self.__canonical_formula__(formula) for formula in mapping.mapping.values()
+        ]
+
+    @staticmethod
+    def __canonical_formula__(formula: str) -> str:
+        try:
+            return str(parse_formula_as_object(formula))
+        except Exception:
+            return " ".join(formula.split())
+
+    def key(self, conjuncts: int) -> str:
+        formulas = sorted({self.canonical[i] for i in iterate_bits(conjuncts)})
+        return sha256("\0".join(formulas).encode("utf-8")).hexdigest()
+
+    def get(self, conjuncts: int) -> tuple[MUCStatus, int | None] | None:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT status, witness_length FROM certifications WHERE key = ?",
+                (self.key(conjuncts),),
+            ).fetchone()
+
+        if row is None:
+            return None
+        return MUCStatus(row[0]), row[1]
+
+    def put(self, conjuncts: int, status: MUCStatus, witness_length: int | None):
+        if status == MUCStatus.UNKNOWN:
+            return
+
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO certifications VALUES (?, ?, ?)",
+                (self.key(conjuncts), int(status), witness_length),
+            )
+            self.connection.commit()
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -1,2 +1,5 @@
 from .black import BLACKCertifier
 from .aaltaf import AALTAFCertifier
+from .tiered import TieredCertifier
+from .clingo_incremental import ClingoCertifier
+from .portfolio import PortfolioCertifier
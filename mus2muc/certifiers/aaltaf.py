@@ -1,33 +1,24 @@
-from mus2muc.interfaces import Certifier, ConjunctMapping, MUCStatus
-from subprocess import Popen, PIPE
-from typing import Tuple, Optional
 from mus2muc.constants import Constants
-import tempfile
+from mus2muc.interfaces import ConjunctMapping, ExternalCertifier, MUCStatus
 
-class AALTAFCertifier(Certifier):
+
+class AALTAFCertifier(ExternalCertifier):
     EXECUTABLE_NAME = "aaltaf"
+    ISOLATED_WORKDIR = True
 
     def __init__(self, m: ConjunctMapping, aaltaf_executable_name):
         self.executable_name = aaltaf_executable_name
         super().__init__(m)
 
-    def __call_solver__(self, formula_string: str) -> Tuple[str, str]:
-        cmd = [self.executable_name, "-e"]
-        with tempfile.TemporaryDirectory() as tempdir:
-            aaltaf_process = Popen(cmd, stdin=PIPE, stdout=PIPE, stderr=PIPE, cwd=tempdir)
-            try:
-                aaltaf_stdout, aaltaf_stderr = aaltaf_process.communicate(
-                    formula_string.encode("ascii")
-                )
-
-                return aaltaf_stdout.decode("ascii"), aaltaf_stderr.decode("ascii")
+    def __command__(self) -> list[str]:
+        return [self.executable_name, "-e"]
 
-            finally:
-                aaltaf_process.kill()
+    def __call_solver__(self, formula: bytes) -> tuple[str, str, float]:
+        return self.__run_solver__(formula)
 
     def __decode_solver_output__(
         self, stdout: str, stderr: str
-    ) -> Tuple[MUCStatus, Optional[int]]:
+    ) -> tuple[MUCStatus, int | None]:
         if len(stderr) > 0:
             raise RuntimeError("Qualcosa non va in AALTAF", stderr)
 
@@ -1,19 +1,18 @@
 import json
-from mus2muc.interfaces import Certifier, ConjunctMapping, MUCStatus
-from subprocess import Popen, PIPE
-from typing import Tuple, Optional
+
 from mus2muc.constants import Constants
+from mus2muc.interfaces import ConjunctMapping, ExternalCertifier, MUCStatus
 
 
-class BLACKCertifier(Certifier):
+class BLACKCertifier(ExternalCertifier):
     EXECUTABLE_NAME = "black"
 
     def __init__(self, m: ConjunctMapping, black_executable_name):
         self.executable_name = black_executable_name
         super().__init__(m)
 
-    def __call_solver__(self, formula_string: str) -> Tuple[str, str]:
-        cmd = [
+    def __command__(self) -> list[str]:
+        return [
             self.executable_name,
             "solve",
             "--finite",
@@ -22,17 +21,13 @@ class BLACKCertifier(Certifier):
             "json",
             "-",
         ]
-        black_process = Popen(cmd, stdin=PIPE, stdout=PIPE, stderr=PIPE)
-        try:
-            stdout, stderr = black_process.communicate(formula_string.encode("ascii"))
-            return stdout.decode("ascii"), stderr.decode("ascii")
 
-        finally:
-            black_process.kill()
+    def __call_solver__(self, formula: bytes) -> tuple[str, str, float]:
+        return self.__run_solver__(formula)
 
     def __decode_solver_output__(
         self, stdout: str, stderr: str
-    ) -> Tuple[MUCStatus, Optional[int]]:
+    ) -> tuple[MUCStatus, int | None]:
         if len(stderr) > 0:
             raise RuntimeError("BLACK STDERR NOT EMPTY", stderr)
 
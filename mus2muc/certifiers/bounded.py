@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import clingo
+
+from mus2muc.constants import Constants
+from mus2muc.interfaces import ConjunctMapping
+
+
+class BoundedChecker:
+    # Bounded satisfiability of sets of conjuncts, on a single clingo.Control
+    # grounded with the multi-shot encoding. A set is checked by assuming
+    # its __mus__ atoms true and the others false; extending the bound
+    # grounds only the new time steps.
+    def __init__(
+        self, mapping: ConjunctMapping, annotated_program: str, encoding_path: Path
+    ):
+        self.ctl = clingo.Control(["--warn=none"])
+        self.ctl.add("base", [], annotated_program + "\n" + encoding_path.read_text())
+        self.ctl.ground([("base", [])])
+
+        self.literals: dict[int, int] = {
+            mapping.ids[atom.symbol.arguments[0].string]: atom.literal
+            for atom in self.ctl.symbolic_atoms.by_signature(
+                Constants.MUS_PREDICATE_NAME, 1
+            )
+        }
+        self.bound = 0
+        self.active: int | None = None
+        # Whether the last check was interrupted, see clingo.Control.interrupt.
+        self.interrupted = False
+
+    def __horizon_atom__(self, h: int) -> clingo.Symbol:
+        return clingo.Function("horizon", [clingo.Number(h - 1)])
+
+    def extend(self, h: int):
+        # Grounds the time steps of the traces of length at most h.
+        for step in range(self.bound, h):
+            self.ctl.ground([("step", [clingo.Number(step)])])
+        self.bound = max(self.bound, h)
+
+    def __activate__(self, h: int):
+        if self.active == h:
+            return
+        if self.active is not None:
+            self.ctl.assign_external(self.__horizon_atom__(self.active), False)
+        self.ctl.assign_external(self.__horizon_atom__(h), True)
+        self.active = h
+
+    def check(self, conjuncts: int, h: int | None = None) -> int | None:
+        # Returns the length of a witness trace of length at most h (the
+        # bound by default), or None if there is none.
+        self.__activate__(self.bound if h is None else h)
+        assumptions = [
+            literal if conjuncts >> c & 1 else -literal
+            for c, literal in self.literals.items()
+        ]
+        firsts = []
+
+        def on_model(model):
+            firsts.extend(
+                x.arguments[0].number
+                for x in model.symbols(shown=True)
+                if x.name == "first"
+            )
+
+        result = self.ctl.solve(assumptions=assumptions, on_model=on_model)
+        self.interrupted = result.interrupted
+        if not result.satisfiable:
+            return None
+        # The trace of a model starts at one of its first(D) states.
+        return min(firsts) + 1
+
+    def shortest(self, conjuncts: int, above: int = 0) -> int | None:
+        # A witness of the smallest length within the bound: the enumeration
+        # restarts at the horizon of the witness. The set is known to have
+        # no witness of length at most `above`, e.g. the horizon of its MUS.
+        if above >= self.bound:
+            return None
+
+        model_length = self.check(conjuncts)
+        for h in range(above + 1, model_length or 0):
+            shorter = self.check(conjuncts, h)
+            if shorter is not None:
+                return shorter
+        return model_length
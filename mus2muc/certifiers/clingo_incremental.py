@@ -0,0 +1,134 @@
+from pathlib import Path
+from threading import Lock, get_ident
+from time import perf_counter
+
+from mus2muc.certifiers.bounded import BoundedChecker
+from mus2muc.interfaces import (
+    MUS,
+    Certifier,
+    CertifierOutput,
+    ConjunctMapping,
+    MUCStatus,
+)
+from mus2muc.metrics import metrics
+from mus2muc.utils import Logger
+
+
+class ClingoCertifier(Certifier):
+    # Certifies MUSes in-process, on the multi-shot encoding grounded once
+    # for all the conjuncts: a MUS is selected by assumptions on its
+    # __mus__ atoms. A MUS found at horizon k has no witness of length at
+    # most k: horizons k+1, 2(k+1), ... up to `bound` are tried in turn,
+    # grounding new time steps only when no earlier call needed them, and
+    # the first witness is returned, shortened to the smallest length. A MUS
+    # without witnesses up to `bound` is passed to the `fallback` certifier,
+    # or reported as UNKNOWN without one. Cancelling a certification
+    # interrupts its clingo solve, and reports it as UNKNOWN.
+    def __init__(
+        self,
+        m: ConjunctMapping,
+        annotated_program: str,
+        encoding_path: Path,
+        bound: int,
+        fallback: Certifier | None = None,
+    ):
+        super().__init__(m)
+        self.checker = BoundedChecker(m, annotated_program, encoding_path)
+        self.bound = bound
+        self.fallback = fallback
+        self.lock = Lock()
+        # The thread running the solves of `checker`.
+        self.solving: int | None = None
+        self.solving_lock = Lock()
+
+    def use_warm_processes(self, size: int):
+        if self.fallback is not None:
+            self.fallback.use_warm_processes(size)
+
+    def cancel(self, thread: int | None = None):
+        super().cancel(thread)
+        with self.solving_lock:
+            if self.solving is not None and thread in (None, self.solving):
+                self.checker.ctl.interrupt()
+        if self.fallback is not None:
+            self.fallback.cancel(thread)
+
+    def close(self):
+        super().close()
+        if self.fallback is not None:
+            self.fallback.close()
+
+    def __check__(self, conjuncts: int, h: int) -> int | None:
+        # An interrupt that came after the solves of a cancelled
+        # certification interrupts the next solve: it is run again.
+        while not self.__cancelled__():
+            model_length = self.checker.check(conjuncts, h)
+            if not self.checker.interrupted:
+                return model_length
+        return None
+
+    def __witness__(self, conjuncts: int, k: int) -> int | None:
+        unsatisfiable_up_to = k
+        if unsatisfiable_up_to >= self.bound:
+            return None
+
+        h = unsatisfiable_up_to + 1
+        while True:
+            h = min(h, self.bound)
+            self.checker.extend(h)
+            model_length = self.__check__(conjuncts, h)
+            if model_length is not None:
+                break
+            if h == self.bound or self.__cancelled__():
+                return None
+            unsatisfiable_up_to = h
+            h *= 2
+
+        for shorter in range(unsatisfiable_up_to + 1, model_length):
+            witness = self.__check__(conjuncts, shorter)
+            if witness is not None or self.__cancelled__():
+                return witness
+        return model_length
+
+    def certify(self, mus: MUS) -> CertifierOutput:
+        cached = self.__cached__(mus)
+        if cached is not None:
+            return cached
+
+        start = perf_counter()
+        with self.lock, metrics.timed("clingo_certifier_solve"):
+            with self.solving_lock:
+                self.solving = get_ident()
+            try:
+                model_length = self.__witness__(mus.conjuncts, mus.k)
+            finally:
+                with self.solving_lock:
+                    self.solving = None
+
+        if model_length is not None:
+            metrics.count("clingo_certifications", outcome="witness")
+            output = CertifierOutput(
+                perf_counter() - Logger.start,
+                perf_counter() - start,
+                model_length,
+                MUCStatus.SATISFIABLE,
+            )
+        else:
+            output = None
+            if self.__cancelled__():
+                metrics.count("clingo_certifications", outcome="cancelled")
+            elif self.fallback is not None:
+                metrics.count("clingo_certifications", outcome="fallback")
+                output = self.__delegate__(self.fallback, mus)
+            else:
+                metrics.count("clingo_certifications", outcome="unknown")
+
+            if output is None:
+                output = CertifierOutput(
+                    perf_counter() - Logger.start,
+                    perf_counter() - start,
+                    None,
+                    MUCStatus.UNKNOWN,
+                )
+        self.__store__(mus, output)
+        return output
@@ -0,0 +1,189 @@
+from collections.abc import Sequence
+from queue import Queue
+from threading import Lock, Thread, get_ident
+from time import perf_counter
+
+from mus2muc.interfaces import (
+    MUS,
+    Certifier,
+    CertifierOutput,
+    ConjunctMapping,
+    ExternalCertifier,
+    MUCStatus,
+)
+from mus2muc.metrics import metrics
+from mus2muc.processes import SolverProcess
+from mus2muc.utils import Logger
+
+Answer = tuple[MUCStatus, int | None]
+
+
+class PortfolioCertifier(Certifier):
+    # Races the solvers of `members` on the same MUS: the first definitive
+    # answer wins, and the other solvers are killed. Wins are counted per
+    # member over the run. When fewer than all members can run at once
+    # (`width`), the members that won most often race first, and the others
+    # only if they all answer UNKNOWN; every EXPLORE_EVERY-th MUS races all
+    # the members, so that the counts follow the instance.
+    EXPLORE_EVERY = 16
+
+    def __init__(
+        self, m: ConjunctMapping, members: Sequence[ExternalCertifier], width: int
+    ):
+        super().__init__(m)
+        self.members = list(members)
+        self.width = width
+        self.wins = [0] * len(self.members)
+        self.calls = 0
+        self.stats_lock = Lock()
+        self.races: dict[int, list[SolverProcess]] = {}
+        self.races_lock = Lock()
+
+    def use_warm_processes(self, size: int):
+        for member in self.members:
+            member.use_warm_processes(size)
+
+    def cancel(self, thread: int | None = None):
+        super().cancel(thread)
+        with self.races_lock:
+            if thread is None:
+                races = list(self.races.values())
+                self.races.clear()
+            else:
+                races = [self.races.pop(thread, [])]
+            running = [p for processes in races for p in processes]
+
+        for process in running:
+            process.kill()
+
+    def close(self):
+        super().close()
+        for member in self.members:
+            member.close()
+
+    def __member_name__(self, i: int) -> str:
+        return type(self.members[i]).EXECUTABLE_NAME
+
+    def __groups__(self) -> list[list[int]]:
+        with self.stats_lock:
+            self.calls += 1
+            explore = self.calls % self.EXPLORE_EVERY == 1
+            ranking = sorted(range(len(self.members)), key=lambda i: -self.wins[i])
+
+        if explore or self.width >= len(ranking):
+            return [ranking]
+        return [ranking[i : i + self.width] for i in range(0, len(ranking), self.width)]
+
+    def __spawn_member__(self, i: int) -> SolverProcess:
+        member = self.members[i]
+        with metrics.timed("certifier_spawn"):
+            if member.warm_pool is not None:
+                return member.warm_pool.acquire()
+            return SolverProcess(member.__command__(), member.ISOLATED_WORKDIR)
+
+    def __run_member__(
+        self, i: int, process: SolverProcess, formula: bytes, answers: "Queue"
+    ):
+        # A killed solver, or one that cannot be decoded, answers UNKNOWN.
+        answer: Answer = (MUCStatus.UNKNOWN, None)
+        try:
+            stdout, stderr = process.communicate(formula)
+            answer = self.members[i].__decode_solver_output__(
+                stdout.decode("ascii"), stderr.decode("ascii")
+            )
+        except Exception:
+            pass
+        answers.put((i, answer))
+
+    def __race__(self, mus: MUS, group: list[int]) -> tuple[Answer, int | None] | None:
+        # Returns the first definitive answer and its member, or UNKNOWN and
+        # None; None if the race was cancelled before an answer. The race is
+        # registered before its solvers are spawned, so that `cancel` reaches
+        # every one of them.
+        ident = get_ident()
+        with self.races_lock:
+            self.races[ident] = []
+        if self.__cancelled__():
+            with self.races_lock:
+                self.races.pop(ident, None)
+            return None
+
+        processes: dict[int, SolverProcess] = {}
+        for i in group:
+            processes[i] = self.__spawn_member__(i)
+            with self.races_lock:
+                race = self.races.get(ident)
+                if race is not None:
+                    race.append(processes[i])
+
+            if race is None:
+                for process in processes.values():
+                    process.kill()
+                    process.close()
+                return None
+
+        answers: Queue[tuple[int, Answer]] = Queue()
+        racers = [
+            Thread(
+                target=self.__run_member__,
+                args=(i, processes[i], self.members[i].__build_formula__(mus), answers),
+                daemon=True,
+                name=f"portfolio-{self.__member_name__(i)}",
+            )
+            for i in group
+        ]
+        for racer in racers:
+            racer.start()
+
+        answer: Answer = (MUCStatus.UNKNOWN, None)
+        winner = None
+        try:
+            with metrics.timed("certifier_solve"):
+                for _ in group:
+                    i, answer = answers.get()
+                    if answer[0] != MUCStatus.UNKNOWN:
+                        winner = i
+                        break
+        finally:
+            with self.races_lock:
+                cancelled = self.races.pop(ident, None) is None
+            for process in processes.values():
+                process.kill()
+            for racer in racers:
+                racer.join()
+            for process in processes.values():
+                process.close()
+
+        if cancelled and winner is None:
+            return None
+        return answer, winner
+
+    def certify(self, mus: MUS) -> CertifierOutput:
+        cached = self.__cached__(mus)
+        if cached is not None:
+            return cached
+
+        start = perf_counter()
+        answer: Answer = (MUCStatus.UNKNOWN, None)
+        for group in self.__groups__():
+            race = self.__race__(mus, group)
+            if race is None:
+                break
+
+            answer, winner = race
+            if winner is not None:
+                with self.stats_lock:
+                    self.wins[winner] += 1
+                metrics.count("portfolio_wins", certifier=self.__member_name__(winner))
+                break
+        end = perf_counter()
+
+        status, model_length = answer
+        if status == MUCStatus.SATISFIABLE:
+            assert model_length is not None
+
+        output = CertifierOutput(
+            perf_counter() - Logger.start, end - start, model_length, status
+        )
+        self.__store__(mus, output)
+        return output
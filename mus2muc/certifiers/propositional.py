@@ -0,0 +1,137 @@
+import clingo
+
+from mus2muc.interfaces import ConjunctMapping, MUCStatus
+from mus2muc.interfaces.model import iterate_bits
+from mus2muc.ltlf_parser import parse_formula_as_object
+from mus2muc.ltlf_parser.syntax import (
+    Always,
+    Conjunction,
+    Disjunction,
+    Equals,
+    Eventually,
+    Faux,
+    Formula,
+    Implies,
+    Negate,
+    Next,
+    Proposition,
+    Release,
+    Truth,
+    Until,
+    WeakNext,
+)
+
+
+class PropositionalAbstraction:
+    # Abstraction of the conjuncts to the first state of a trace: h(N) holds
+    # if the subformula N holds there, and the temporal operators are
+    # unfolded once, leaving what must hold from the second state on to a
+    # free atom, x(N) for strong obligations and w(N) for weak ones. Every
+    # trace satisfying a set of conjuncts induces an answer set, so a set
+    # without answer sets is unsatisfiable. With the external `single`, the
+    # trace has no second state: x(N) is false and w(N) is true, and the
+    # answer sets are exactly the traces of length 1.
+    def __init__(self, mapping: ConjunctMapping):
+        self.rules: list[str] = []
+        self.translated = set()
+        self.roots: dict[int, clingo.Symbol] = {}
+        # Conjuncts with an operator that is not abstracted are never checked.
+        self.unsupported = 0
+        for c, fragment in enumerate(mapping.fragments):
+            try:
+                self.roots[c] = self.__translate__(parse_formula_as_object(fragment))
+            except NotImplementedError:
+                self.unsupported |= 1 << c
+
+        self.ctl = clingo.Control(["--warn=none"])
+        self.ctl.add("base", [], "#external single. [free]\n" + "\n".join(self.rules))
+        self.ctl.ground([("base", [])])
+        self.single = self.ctl.symbolic_atoms[clingo.Function("single")].literal
+        # Roots that were simplified away by the grounder never hold.
+        self.literals: dict[int, int | None] = {}
+        for c, root in self.roots.items():
+            atom = self.ctl.symbolic_atoms[clingo.Function("h", [root])]
+            self.literals[c] = None if atom is None else atom.literal
+
+    def __translate__(self, f: Formula) -> clingo.Symbol:
+        # Subformulas are named by their id, shared by equal subformulas.
+        n = f.id
+        if n in self.translated:
+            return n
+
+        rules = self.__rules__(f, n)
+        self.translated.add(n)
+        self.rules += rules
+        return n
+
+    def __rules__(self, f: Formula, n: clingo.Symbol) -> list[str]:
+        if isinstance(f, Truth):
+            return [f"h({n})."]
+        if isinstance(f, Faux):
+            return []
+        if isinstance(f, Proposition):
+            return [f"{{ h({n}) }}."]
+        if isinstance(f, Negate):
+            return [f"h({n}) :- not h({self.__translate__(f.f)})."]
+        if isinstance(f, Conjunction):
+            body = ", ".join(f"h({self.__translate__(x)})" for x in f.fs)
+            return [f"h({n}) :- {body}."]
+        if isinstance(f, Disjunction):
+            return [f"h({n}) :- h({self.__translate__(x)})." for x in f.fs]
+        if isinstance(f, Implies):
+            lhs, rhs = self.__translate__(f.lhs), self.__translate__(f.rhs)
+            return [f"h({n}) :- not h({lhs}).", f"h({n}) :- h({rhs})."]
+        if isinstance(f, Equals):
+            lhs, rhs = self.__translate__(f.lhs), self.__translate__(f.rhs)
+            return [
+                f"h({n}) :- h({lhs}), h({rhs}).",
+                f"h({n}) :- not h({lhs}), not h({rhs}).",
+            ]
+
+        strong = [f"{{ x({n}) }}.", f":- single, x({n})."]
+        weak = [f"{{ w({n}) }}.", f":- single, not w({n})."]
+        if isinstance(f, Next):
+            return strong + [f"h({n}) :- x({n})."]
+        if isinstance(f, WeakNext):
+            return weak + [f"h({n}) :- w({n})."]
+        if isinstance(f, Eventually):
+            return strong + [
+                f"h({n}) :- h({self.__translate__(f.f)}).",
+                f"h({n}) :- x({n}).",
+            ]
+        if isinstance(f, Always):
+            return weak + [f"h({n}) :- h({self.__translate__(f.f)}), w({n})."]
+        if isinstance(f, Until):
+            lhs, rhs = self.__translate__(f.lhs), self.__translate__(f.rhs)
+            return strong + [f"h({n}) :- h({rhs}).", f"h({n}) :- h({lhs}), x({n})."]
+        if isinstance(f, Release):
+            lhs, rhs = self.__translate__(f.lhs), self.__translate__(f.rhs)
+            return weak + [
+                f"h({n}) :- h({rhs}), h({lhs}).",
+                f"h({n}) :- h({rhs}), w({n}).",
+            ]
+
+        raise NotImplementedError(type(f).__name__)
+
+    def supports(self, conjuncts: int) -> bool:
+        return conjuncts & self.unsupported == 0
+
+    def __solve__(self, conjuncts: int, single: bool) -> bool:
+        assumptions = [self.literals[c] for c in iterate_bits(conjuncts)]
+        if None in assumptions:
+            return False
+        assumptions.append(self.single if single else -self.single)
+        return self.ctl.solve(assumptions=assumptions).satisfiable
+
+    def check(self, conjuncts: int, k: int = 0) -> tuple[MUCStatus, int | None]:
+        # SATISFIABLE comes with the length of its witness, 1; UNKNOWN if
+        # the abstraction cannot decide. Sets known to have no witness of
+        # length at most k, such as MUSes found at horizon k, skip the
+        # search for a witness of length 1 when k >= 1.
+        if not self.supports(conjuncts):
+            return MUCStatus.UNKNOWN, None
+        if k < 1 and self.__solve__(conjuncts, True):
+            return MUCStatus.SATISFIABLE, 1
+        if not self.__solve__(conjuncts, False):
+            return MUCStatus.UNSATISFIABLE, None
+        return MUCStatus.UNKNOWN, None
@@ -0,0 +1,89 @@
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+
+from mus2muc.certifiers.bounded import BoundedChecker
+from mus2muc.certifiers.propositional import PropositionalAbstraction
+from mus2muc.interfaces import (
+    MUS,
+    Certifier,
+    CertifierOutput,
+    ConjunctMapping,
+    MUCStatus,
+)
+from mus2muc.metrics import metrics
+from mus2muc.utils import Logger
+
+
+class TieredCertifier(Certifier):
+    # Certifies a MUS in-process when a cheap check decides it, and calls the
+    # `full` certifier otherwise:
+    #  1. the propositional abstraction, which proves some sets
+    #     unsatisfiable;
+    #  2. a bounded check with clingo, which finds the shortest witnesses
+    #     longer than the horizon of the MUS, and of length at most
+    #     `horizon`.
+    # The cheap checks share their clingo.Controls and run one at a time.
+    def __init__(
+        self,
+        m: ConjunctMapping,
+        full: Certifier,
+        annotated_program: str,
+        encoding_path: Path,
+        horizon: int,
+    ):
+        super().__init__(m)
+        self.full = full
+        self.abstraction = PropositionalAbstraction(m)
+        self.bounded: BoundedChecker | None = None
+        if horizon > 1:
+            self.bounded = BoundedChecker(m, annotated_program, encoding_path)
+            self.bounded.extend(horizon)
+        self.lock = Lock()
+
+    def use_warm_processes(self, size: int):
+        self.full.use_warm_processes(size)
+
+    def cancel(self, thread: int | None = None):
+        super().cancel(thread)
+        self.full.cancel(thread)
+
+    def close(self):
+        super().close()
+        self.full.close()
+
+    def __cheap_check__(self, mus: MUS) -> tuple[MUCStatus, int | None, str]:
+        # A MUS found at horizon k has no witness of length at most k.
+        status, model_length = self.abstraction.check(mus.conjuncts, mus.k)
+        if status != MUCStatus.UNKNOWN:
+            return status, model_length, "propositional"
+
+        if self.bounded is not None:
+            model_length = self.bounded.shortest(mus.conjuncts, above=mus.k)
+            if model_length is not None:
+                return MUCStatus.SATISFIABLE, model_length, "bounded"
+
+        return MUCStatus.UNKNOWN, None, "full"
+
+    def certify(self, mus: MUS) -> CertifierOutput:
+        cached = self.__cached__(mus)
+        if cached is not None:
+            return cached
+
+        start = perf_counter()
+        with self.lock, metrics.timed("tiered_cheap_check"):
+            status, model_length, tier = self.__cheap_check__(mus)
+        metrics.count("tiered_certifications", tier=tier)
+
+        output = None
+        if status == MUCStatus.UNKNOWN:
+            output = self.__delegate__(self.full, mus)
+        if output is None:
+            output = CertifierOutput(
+                perf_counter() - Logger.start,
+                perf_counter() - start,
+                model_length,
+                status,
+            )
+        self.__store__(mus, output)
+        return output
@@ -1,42 +1,81 @@
-from mus2muc.certifiers.aaltaf import AALTAFCertifier
-from mus2muc.certifiers.black import BLACKCertifier
-from mus2muc.generators import WASPGenerator, WASPGeneratorThread
-from mus2muc.interfaces import ConjunctMapping, Options, CertifierType
-from mus2muc.ltlf_parser import compose_logic_program
+import os
+import signal
 import sys
-from mus2muc.enumeration import MUS2MUC
 from argparse import ArgumentParser
-from mus2muc.enumeration import LTLF2ASP_ENCODING_PATH
-from mus2muc.utils import Logger
 from pathlib import Path
-import os
 from time import perf_counter
 
-from mus2muc.writers import OutputWriter, VerboseWriter
+from mus2muc.certification_cache import CertificationCache
+from mus2muc.certifiers.aaltaf import AALTAFCertifier
+from mus2muc.certifiers.black import BLACKCertifier
+from mus2muc.certifiers.clingo_incremental import ClingoCertifier
+from mus2muc.certifiers.portfolio import PortfolioCertifier
+from mus2muc.certifiers.tiered import TieredCertifier
+from mus2muc.enumeration import (
+    LTLF2ASP_ENCODING_PATH,
+    LTLF2ASP_INCREMENTAL_ENCODING_PATH,
+    MUS2MUC,
+    AsyncGeneratorAdapter,
+    AsyncMUS2MUC,
+)
+from mus2muc.generators import (
+    AsyncWASPGenerator,
+    ClingoIncrementalGenerator,
+    GroundCache,
+    Grounder,
+    WASPEnsembleGenerator,
+    WASPGeneratorThread,
+)
+from mus2muc.interfaces import (
+    CertifierType,
+    ConjunctMapping,
+    FlushPolicy,
+    GeneratorType,
+    Options,
+    OutputFormat,
+    SerializerType,
+)
+from mus2muc.ltlf_parser import (
+    annotate_formulae,
+    compose_logic_program,
+    compose_probe_program,
+)
+from mus2muc.metrics import MetricsDumper, metrics
+from mus2muc.utils import Logger, cache_directory
+from mus2muc.writers import BinaryWriter, OutputWriter, VerboseWriter
+from mus2muc.writers.serializers import get_serializer
+
 
+def external_certifiers(options: Options) -> list[CertifierType]:
+    # The certifiers run as executables of the bin folder.
+    if options.certifier_type == CertifierType.CLINGO:
+        return (
+            [] if options.fallback_certifier is None else [options.fallback_certifier]
+        )
+    if options.certifier_type == CertifierType.PORTFOLIO:
+        return list(options.portfolio)
+    return [options.certifier_type]
 
-def check_dependencies(certifier, bin_folder):
+
+def check_dependencies(certifiers, generator, bin_folder):
     files = [x.name for x in bin_folder.glob("*")]
     fail = False
-    if "wasp" not in files:
+    if generator == GeneratorType.WASP and "wasp" not in files:
         fail = True
         print("Missing MUS generator dependency: wasp")
 
-    if certifier.name.lower() not in files:
-        fail = True
-        print("Missing LTLf certifier dependency:", certifier.name)
+    for certifier in certifiers:
+        if certifier.name.lower() not in files:
+            fail = True
+            print("Missing LTLf certifier dependency:", certifier.name)
 
     if fail:
         print("Please check out installation instruction.")
         sys.exit(118)
 
 
-def parse_args() -> Options:
-    parser = ArgumentParser(prog="mus2muc")
-    parser.add_argument(
-        "formula", type=Path, help="Path to a formula in .ltlfconj format."
-    )
-
+def add_engine_arguments(parser: ArgumentParser):
+    # Arguments shared by the single-instance and the batch entry points.
     parser.add_argument(
         "--min-k",
         "-k",
@@ -44,21 +83,91 @@ def parse_args() -> Options:
         help="Starting value for MUC horizon search.",
         default=1,
     )
+    parser.add_argument("--keep-probe", action="store_true")
     parser.add_argument(
-        "--probe-path",
-        type=Path,
-        help="Path to store the logic program used as a probe.",
+        "--in-memory-probe",
+        action="store_true",
+        help="Keep the probe program in memory and send it to gringo over stdin.",
+    )
+    parser.add_argument(
+        "--ground-cache",
+        action="store_true",
+        help="Share ground programs between runs, in the mus2muc cache directory.",
+    )
+    parser.add_argument(
+        "--ground-cache-size",
+        type=int,
+        help="Size limit of the ground program cache, in MB.",
+        default=1024,
     )
-    parser.add_argument("--keep-probe", action="store_true")
     parser.add_argument("-v", "--verbose", action="store_true")
     parser.add_argument(
         "--certifier",
         "-c",
         type=CertifierType,
+        choices=[
+            CertifierType.BLACK,
+            CertifierType.AALTAF,
+            CertifierType.CLINGO,
+            CertifierType.PORTFOLIO,
+        ],
+        default=CertifierType.AALTAF,
+    )
+    parser.add_argument(
+        "--clingo-bound",
+        type=int,
+        help="Maximum length of the witnesses searched by the clingo certifier.",
+        default=16,
+    )
+    parser.add_argument(
+        "--fallback-certifier",
+        type=CertifierType,
         choices=[CertifierType.BLACK, CertifierType.AALTAF],
         default=CertifierType.AALTAF,
+        help="Certifier called when the clingo certifier finds no witness.",
+    )
+    parser.add_argument(
+        "--no-fallback",
+        dest="fallback_certifier",
+        action="store_const",
+        const=None,
+        help="Report MUSes without witnesses up to --clingo-bound as unknown.",
+    )
+    parser.add_argument(
+        "--portfolio",
+        type=CertifierType,
+        nargs="+",
+        choices=[CertifierType.BLACK, CertifierType.AALTAF],
+        default=[CertifierType.AALTAF, CertifierType.BLACK],
+        help="Certifiers raced on each MUS by the portfolio certifier.",
+    )
+    parser.add_argument(
+        "--portfolio-width",
+        type=int,
+        help="Number of portfolio certifiers raced at once on a MUS "
+        "(default: the cores available to each certifier worker).",
+        default=None,
+    )
+    parser.add_argument(
+        "--generator",
+        "-g",
+        type=GeneratorType,
+        choices=[GeneratorType.WASP, GeneratorType.INCREMENTAL],
+        default=GeneratorType.WASP,
+        help="MUS generator: wasp, or in-process incremental grounding with clingo.",
+    )
+    parser.add_argument(
+        "--ensemble-width",
+        type=int,
+        help="Number of wasp instances run at once, at increasing horizons.",
+        default=1,
+    )
+    parser.add_argument(
+        "--ensemble-factor",
+        type=int,
+        help="Ratio between the horizons of consecutive wasp instances.",
+        default=2,
     )
-    parser.add_argument("--output", "-o", type=Path, default=None)
     parser.add_argument("-t", "--total-timeout", type=int, default=None)
     parser.add_argument("-n", "--total-mucs", type=int, default=None)
     parser.add_argument(
@@ -67,20 +176,185 @@ def parse_args() -> Options:
         help="Path to certifier executables.",
         default="/usr/bin",
     )
+    parser.add_argument(
+        "--tiered",
+        action="store_true",
+        help="Try cheap in-process checks with clingo before calling the certifier.",
+    )
+    parser.add_argument(
+        "--cheap-horizon",
+        type=int,
+        help="Maximum length of the witnesses searched by the cheap checks.",
+        default=4,
+    )
+    parser.add_argument(
+        "--certifier-workers",
+        "-j",
+        type=int,
+        help="Number of MUSes certified in parallel.",
+        default=1,
+    )
+    parser.add_argument(
+        "--warm-certifiers",
+        type=int,
+        help="Number of certifier processes kept spawned and ready to answer.",
+        default=0,
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Maximum number of MUSes sent at once by a wasp process.",
+        default=32,
+    )
+    parser.add_argument(
+        "--batch-latency",
+        type=float,
+        help="Maximum time a MUS waits for its batch to be sent, in milliseconds.",
+        default=20,
+    )
+    parser.add_argument(
+        "--certification-cache",
+        action="store_true",
+        help="Reuse certifier answers across runs, in the mus2muc cache directory.",
+    )
+    parser.add_argument(
+        "--output-format",
+        type=OutputFormat,
+        choices=[OutputFormat.JSON, OutputFormat.BINARY],
+        default=OutputFormat.JSON,
+        help="JSON lines, or a binary log of every event (requires -o), "
+        "converted to JSON by mus2muc-log.",
+    )
+    parser.add_argument(
+        "--serializer",
+        type=SerializerType,
+        choices=[SerializerType.JSON, SerializerType.ORJSON],
+        default=SerializerType.JSON,
+        help="JSON encoder of the output; orjson must be installed separately.",
+    )
+    parser.add_argument(
+        "--no-formula",
+        dest="include_formula",
+        action="store_false",
+        help="Leave the formula out of the output, keeping only the conjunct ids.",
+    )
+    parser.add_argument(
+        "--flush-policy",
+        type=FlushPolicy,
+        choices=[FlushPolicy.EVENT, FlushPolicy.COUNT, FlushPolicy.INTERVAL],
+        default=FlushPolicy.EVENT,
+        help="When the output is flushed: after every event, every "
+        "--flush-every events, or every --flush-interval seconds.",
+    )
+    parser.add_argument(
+        "--flush-every",
+        type=int,
+        help="Number of events between flushes of the output.",
+        default=100,
+    )
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        help="Seconds between flushes of the output.",
+        default=1.0,
+    )
+    parser.add_argument(
+        "--async",
+        dest="async_engine",
+        action="store_true",
+        help="Run the enumeration on an asyncio event loop.",
+    )
+    parser.add_argument(
+        "--certifier-timeout",
+        type=float,
+        help="Deadline of a single certifier call, in seconds (with --async).",
+        default=None,
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Write a summary of the time spent in each phase at the end of the run.",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=Path,
+        help="File where the metrics are periodically dumped, in the Prometheus "
+        "text format (with mus2muc-batch: <output-dir>/<instance>.prom).",
+        default=None,
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        help="Seconds between dumps of the metrics file.",
+        default=10.0,
+    )
 
-    args = parser.parse_args()
 
+def options_from_args(
+    args,
+    formula: Path,
+    output_file: Path | None,
+    probe_path=None,
+    metrics_file: Path | None = None,
+) -> Options:
     return Options(
-        input_formula=args.formula,
+        input_formula=formula,
         keep_probe=args.keep_probe,
-        probe_path=args.probe_path,
+        in_memory_probe=args.in_memory_probe,
+        ground_cache=args.ground_cache,
+        ground_cache_size=args.ground_cache_size,
+        probe_path=probe_path,
         k_start=args.min_k,
         certifier_type=args.certifier,
-        output_file=args.output,
+        output_file=output_file,
         total_mucs=args.total_mucs,
         total_timeout=args.total_timeout,
         bin_folder=args.bin_folder.resolve(),
         verbose=args.verbose,
+        certifier_workers=args.certifier_workers,
+        warm_certifiers=args.warm_certifiers,
+        generator_type=args.generator,
+        ensemble_width=args.ensemble_width,
+        ensemble_factor=args.ensemble_factor,
+        batch_size=args.batch_size,
+        batch_latency=args.batch_latency,
+        certification_cache=args.certification_cache,
+        output_format=args.output_format,
+        serializer=args.serializer,
+        include_formula=args.include_formula,
+        flush_policy=args.flush_policy,
+        flush_every=args.flush_every,
+        flush_interval=args.flush_interval,
+        async_engine=args.async_engine,
+        certifier_timeout=args.certifier_timeout,
+        metrics=args.metrics,
+        metrics_file=metrics_file,
+        metrics_interval=args.metrics_interval,
+        tiered=args.tiered,
+        cheap_horizon=args.cheap_horizon,
+        clingo_bound=args.clingo_bound,
+        fallback_certifier=args.fallback_certifier,
+        portfolio=tuple(args.portfolio),
+        portfolio_width=args.portfolio_width,
+    )
+
+
+def parse_args() -> Options:
+    parser = ArgumentParser(prog="mus2muc")
+    parser.add_argument(
+        "formula", type=Path, help="Path to a formula in .ltlfconj format."
+    )
+    parser.add_argument(
+        "--probe-path",
+        type=Path,
+        help="Path to store the logic program used as a probe.",
+    )
+    parser.add_argument("--output", "-o", type=Path, default=None)
+    add_engine_arguments(parser)
+
+    args = parser.parse_args()
+    return options_from_args(
+        args, args.formula, args.output, args.probe_path, args.metrics_file
     )
 
 
@@ -91,39 +365,179 @@ def get_certifier_by_type(t):
         return AALTAFCertifier
 
 
-def main():
-    options = parse_args()
-    check_dependencies(options.certifier_type, options.bin_folder)
+def get_external_certifier(t, bin_folder, mapping):
+    certifier_cls = get_certifier_by_type(t)
+    return certifier_cls(mapping, bin_folder / certifier_cls.EXECUTABLE_NAME)
 
-    Logger.log(options.__dict__)
 
-    probe_file = (
-        options.input_formula.with_name(
-            f".instance={options.input_formula.name}_{os.getpid()}_{perf_counter()}_probe.lp"
+def get_certifier(options, formula_string, mapping):
+    if options.certifier_type == CertifierType.CLINGO:
+        fallback = None
+        if options.fallback_certifier is not None:
+            fallback = get_external_certifier(
+                options.fallback_certifier, options.bin_folder, mapping
+            )
+        return ClingoCertifier(
+            mapping,
+            annotate_formulae(formula_string),
+            LTLF2ASP_INCREMENTAL_ENCODING_PATH,
+            options.clingo_bound,
+            fallback,
+        )
+
+    if options.certifier_type == CertifierType.PORTFOLIO:
+        members = [
+            get_external_certifier(t, options.bin_folder, mapping)
+            for t in options.portfolio
+        ]
+        width = options.portfolio_width
+        if width is None:
+            width = max(1, (os.cpu_count() or 1) // options.certifier_workers)
+        return PortfolioCertifier(mapping, members, width)
+
+    return get_external_certifier(options.certifier_type, options.bin_folder, mapping)
+
+
+def get_generator(options, formula_string, mapping, grounder):
+    if options.generator_type == GeneratorType.INCREMENTAL:
+        return ClingoIncrementalGenerator(
+            options.k_start,
+            annotate_formulae(formula_string),
+            LTLF2ASP_INCREMENTAL_ENCODING_PATH,
+            mapping,
+        )
+
+    if options.ensemble_width > 1:
+        return WASPEnsembleGenerator(
+            options.k_start,
+            grounder,
+            mapping,
+            options.bin_folder,
+            options.ensemble_width,
+            options.ensemble_factor,
+            options.batch_size,
+            options.batch_latency / 1000,
         )
-        if options.probe_path is None
-        else options.probe_path
+
+    return WASPGeneratorThread(
+        options.k_start,
+        grounder,
+        mapping,
+        options.bin_folder,
+        options.batch_size,
+        options.batch_latency / 1000,
+    )
+
+
+def get_async_generator(options, formula_string, mapping, grounder):
+    if options.generator_type == GeneratorType.WASP and options.ensemble_width == 1:
+        return AsyncWASPGenerator(
+            options.k_start, grounder, mapping, options.bin_folder
+        )
+
+    return AsyncGeneratorAdapter(
+        get_generator(options, formula_string, mapping, grounder)
     )
 
+
+def run(options: Options):
+    # Runs the enumeration of a single instance, in the calling process.
+    Logger.start = perf_counter()
+    Logger.log(options.__dict__)
+    metrics.reset()
+    serializer = get_serializer(options.serializer)
+
     formula_string = options.input_formula.open("r").read()
     m = ConjunctMapping.from_formula_string(formula_string)
-    prg = compose_logic_program(formula_string, LTLF2ASP_ENCODING_PATH, probe_file)
 
-    certifier_cls = get_certifier_by_type(options.certifier_type)
-    certifier = certifier_cls(m, options.bin_folder / certifier_cls.EXECUTABLE_NAME)
-    generator = WASPGeneratorThread(options.k_start, prg, options.bin_folder)
-    writer = (
-        VerboseWriter(options.output_file, m)
-        if options.verbose
-        else OutputWriter(options.output_file, m)
+    ground_cache = (
+        GroundCache(cache_directory() / "ground", options.ground_cache_size * 2**20)
+        if options.ground_cache
+        else None
+    )
+
+    probe_file = None
+    if options.in_memory_probe:
+        grounder = Grounder(
+            compose_probe_program(formula_string, LTLF2ASP_ENCODING_PATH), ground_cache
+        )
+    else:
+        probe_file = (
+            options.input_formula.with_name(
+                f".instance={options.input_formula.name}_{os.getpid()}_{perf_counter()}_probe.lp"
+            )
+            if options.probe_path is None
+            else options.probe_path
+        )
+        grounder = Grounder(
+            compose_logic_program(formula_string, LTLF2ASP_ENCODING_PATH, probe_file),
+            ground_cache,
+        )
+
+    certifier = get_certifier(options, formula_string, m)
+    if options.tiered:
+        certifier = TieredCertifier(
+            m,
+            certifier,
+            annotate_formulae(formula_string),
+            LTLF2ASP_INCREMENTAL_ENCODING_PATH,
+            options.cheap_horizon,
+        )
+    if options.warm_certifiers > 0:
+        certifier.use_warm_processes(options.warm_certifiers)
+    if options.certification_cache:
+        certifier.use_cache(
+            CertificationCache(cache_directory() / "certifications.sqlite3", m)
+        )
+    generator = (
+        get_async_generator(options, formula_string, m, grounder)
+        if options.async_engine
+        else get_generator(options, formula_string, m, grounder)
+    )
+    writer_cls = VerboseWriter if options.verbose else OutputWriter
+    if options.output_format == OutputFormat.BINARY:
+        writer_cls = BinaryWriter
+    writer = writer_cls(
+        options.output_file,
+        m,
+        flush_policy=options.flush_policy,
+        flush_every=options.flush_every,
+        flush_interval=options.flush_interval,
+        serializer=serializer,
+        include_formula=options.include_formula,
     )
 
-    solver = MUS2MUC(generator, certifier, writer, options)
-    exit_code = solver.start()
+    dumper = None
+    if options.metrics_file is not None:
+        dumper = MetricsDumper(options.metrics_file, options.metrics_interval)
+        dumper.start()
+
+    engine = AsyncMUS2MUC if options.async_engine else MUS2MUC
+    solver = engine(generator, certifier, writer, options)
+    try:
+        exit_code = solver.start()
+    finally:
+        if dumper is not None:
+            dumper.stop()
+        if options.metrics:
+            writer.run_metrics(metrics.summary())
+        writer.close()
+        if probe_file is not None and options.keep_probe is False:
+            probe_file.unlink()
+
+    Logger.log(f"Complete, exit code: {exit_code}")
+    return exit_code
 
-    Logger.log("Complete, exit code: {}".format(exit_code))
 
-    if options.keep_probe is False:
-        probe_file.unlink()
+def __on_sigterm__(signum, frame):
+    # Unwinds like SIGINT does, so that the output is flushed and closed.
+    sys.exit(128 + signum)
 
-    sys.exit(exit_code)
+
+def main():
+    signal.signal(signal.SIGTERM, __on_sigterm__)
+    options = parse_args()
+    check_dependencies(
+        external_certifiers(options), options.generator_type, options.bin_folder
+    )
+    sys.exit(run(options))
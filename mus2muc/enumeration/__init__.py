@@ -1,4 +1,6 @@
 from pathlib import Path
 from .mus2muc import MUS2MUC
+from .async_mus2muc import AsyncMUS2MUC, AsyncGeneratorAdapter
 
 LTLF2ASP_ENCODING_PATH = Path(__file__).parent / "ltlf2asp.lp"
+LTLF2ASP_INCREMENTAL_ENCODING_PATH = Path(__file__).parent / "ltlf2asp_incremental.lp"
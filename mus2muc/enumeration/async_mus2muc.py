@@ -0,0 +1,373 @@
+import asyncio
+from asyncio.subprocess import PIPE
+from collections.abc import Callable, Sequence
+from contextlib import nullcontext
+from queue import Queue
+from tempfile import TemporaryDirectory
+from threading import Event, Thread, get_ident
+from time import perf_counter
+
+from mus2muc.enumeration.muc_index import MUCIndex
+from mus2muc.enumeration.mus2muc import MUS2MUC, MUS2MUCResult
+from mus2muc.interfaces import (
+    MUS,
+    AsyncMUSGenerator,
+    Certifier,
+    CertifierOutput,
+    ExternalCertifier,
+    MUCStatus,
+    MUCWriter,
+    MUSGenerator,
+    Options,
+)
+from mus2muc.metrics import metrics
+from mus2muc.utils import Logger, log
+
+
+def start_daemon_thread(fn, *args) -> tuple[Thread, asyncio.Future]:
+    # Unlike asyncio.to_thread, the thread is not joined when the event loop
+    # shuts down: a blocking call that is cancelled, such as a read from the
+    # queue of a killed WaspRunner, cannot keep the program from exiting.
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(result, error):
+        if not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def target():
+        try:
+            result, error = fn(*args), None
+        except Exception as e:
+            result, error = None, e
+
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(resolve, result, error)
+
+    thread = Thread(target=target, daemon=True)
+    thread.start()
+    return thread, future
+
+
+async def run_in_daemon_thread(fn, *args):
+    _, future = start_daemon_thread(fn, *args)
+    return await future
+
+
+class AsyncGeneratorAdapter(AsyncMUSGenerator):
+    # Runs a blocking MUSGenerator behind the AsyncMUSGenerator interface.
+    # Generators are not thread-safe: every call runs on a single worker
+    # thread, in the order of the calls. A get_muses that is cancelled, when
+    # the engine restarts, still runs to completion before the restart, and
+    # its MUSes are dropped. Only `kill` bypasses the worker, which may be
+    # blocked in the generator when the run ends.
+    def __init__(self, generator: MUSGenerator):
+        super().__init__(generator.horizon)
+        self.generator = generator
+        self.blocked = generator.blocked
+        self.calls: Queue[tuple[Callable, tuple, asyncio.Future | None] | None] = (
+            Queue()
+        )
+        self.worker = Thread(target=self.__serve__, daemon=True, name="generator")
+        self.worker.start()
+
+    def __serve__(self):
+        while (call := self.calls.get()) is not None:
+            fn, args, future = call
+            try:
+                result, error = fn(*args), None
+            except Exception as e:
+                result, error = None, e
+
+            if future is None:
+                if error is not None:
+                    log(f"Generator call failed: {error!r}")
+                continue
+
+            loop = future.get_loop()
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self.__resolve__, future, result, error)
+
+    @staticmethod
+    def __resolve__(future: asyncio.Future, result, error):
+        # The future of a cancelled call is already done: its result is
+        # dropped.
+        if not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    async def __call_generator__(self, fn, *args):
+        future = asyncio.get_running_loop().create_future()
+        self.calls.put((fn, args, future))
+        return await future
+
+    async def start(self):
+        await self.__call_generator__(self.generator.start)
+
+    def kill(self):
+        self.calls.put(None)
+        self.generator.kill()
+
+    def block(self, mus: MUS):
+        self.calls.put((self.generator.block, (mus,), None))
+
+    async def set_horizon_and_restart(self, h: int):
+        await self.__call_generator__(self.generator.set_horizon_and_restart, h)
+        self.horizon = self.generator.horizon
+
+    async def get_muses(self) -> Sequence[MUS]:
+        return await self.__call_generator__(self.generator.get_muses)
+
+
+class AsyncCertifierAdapter:
+    # Runs the solver of a Certifier as an asyncio subprocess, so that it can
+    # be killed as soon as its result is not needed anymore, or when it runs
+    # past its deadline. A solver call past its deadline is reported as
+    # UNKNOWN. Other certifiers, and certifiers with warm processes, are
+    # called in a thread, under the same deadline: the certification of the
+    # thread is cancelled when it is reached, or when the result is not
+    # needed anymore.
+    def __init__(self, certifier: Certifier, deadline: float | None = None):
+        self.certifier = certifier
+        self.deadline = deadline
+
+    async def __call_solver__(self, formula: bytes) -> tuple[str, str, float]:
+        workdir = (
+            TemporaryDirectory() if self.certifier.ISOLATED_WORKDIR else nullcontext()
+        )
+        with workdir as cwd:
+            with metrics.timed("certifier_spawn"):
+                process = await asyncio.create_subprocess_exec(
+                    *self.certifier.__command__(),
+                    stdin=PIPE,
+                    stdout=PIPE,
+                    stderr=PIPE,
+                    cwd=cwd,
+                )
+            start = perf_counter()
+            try:
+                with metrics.timed("certifier_solve"):
+                    stdout, stderr = await process.communicate(formula)
+            finally:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+            elapsed = perf_counter() - start
+
+        return stdout.decode("ascii"), stderr.decode("ascii"), elapsed
+
+    def __deadline_reached__(self, mus: MUS, start: float) -> CertifierOutput:
+        log(
+            f"Certifier deadline reached for {self.certifier.mapping.labels_of(mus.conjuncts)}"
+        )
+        return CertifierOutput(
+            perf_counter() - Logger.start,
+            perf_counter() - start,
+            None,
+            MUCStatus.UNKNOWN,
+        )
+
+    def __certify_tracked__(self, mus: MUS, tracked: Event) -> CertifierOutput:
+        tracked.wait()
+        try:
+            return self.certifier.certify(mus)
+        finally:
+            self.certifier.__untrack__(get_ident())
+
+    async def __certify_in_thread__(self, mus: MUS) -> CertifierOutput:
+        # The thread is tracked before it certifies, so that `cancel` reaches
+        # the solvers it starts at any point.
+        tracked = Event()
+        thread, future = start_daemon_thread(self.__certify_tracked__, mus, tracked)
+        self.certifier.__track__(thread.ident)
+        tracked.set()
+
+        start = perf_counter()
+        try:
+            async with asyncio.timeout(self.deadline):
+                return await future
+        except TimeoutError:
+            self.certifier.cancel(thread.ident)
+            return self.__deadline_reached__(mus, start)
+        except asyncio.CancelledError:
+            self.certifier.cancel(thread.ident)
+            raise
+
+    async def certify(self, mus: MUS) -> CertifierOutput:
+        if (
+            not isinstance(self.certifier, ExternalCertifier)
+            or self.certifier.warm_pool is not None
+        ):
+            return await self.__certify_in_thread__(mus)
+
+        cached = self.certifier.__cached__(mus)
+        if cached is not None:
+            return cached
+
+        formula = self.certifier.__build_formula__(mus)
+        start = perf_counter()
+        try:
+            async with asyncio.timeout(self.deadline):
+                stdout, stderr, elapsed = await self.__call_solver__(formula)
+        except TimeoutError:
+            return self.__deadline_reached__(mus, start)
+        status, model_length = self.certifier.__decode_solver_output__(stdout, stderr)
+
+        if status == MUCStatus.SATISFIABLE:
+            assert model_length is not None
+
+        output = CertifierOutput(
+            perf_counter() - Logger.start, elapsed, model_length, status
+        )
+        self.certifier.__store__(mus, output)
+        return output
+
+
+class AsyncMUS2MUC(MUS2MUC):
+    # Event-loop variant of MUS2MUC: the generator is read while up to
+    # `certifier_workers` certifications run, results are still applied in
+    # generation order, and the total timeout and the required number of
+    # MUCs stop the enumeration right away, killing the running solvers.
+    def __init__(
+        self,
+        generator: AsyncMUSGenerator,
+        certifier: Certifier,
+        writer: MUCWriter,
+        options: Options,
+    ):
+        super().__init__(generator, certifier, writer, options)
+        self.async_certifier = AsyncCertifierAdapter(
+            certifier, options.certifier_timeout
+        )
+
+    def start(self):
+        try:
+            return asyncio.run(self.enumerate_muses())
+        finally:
+            self.certifier.close()
+
+    async def enumerate_muses(self):
+        deadline = None
+        if self.options.total_timeout is not None:
+            loop_time = asyncio.get_running_loop().time()
+            elapsed = perf_counter() - Logger.start
+            deadline = loop_time + self.options.total_timeout - elapsed
+
+        try:
+            async with asyncio.timeout_at(deadline):
+                return await self.__enumerate__()
+        except TimeoutError:
+            log("Timeout reached!")
+            return MUS2MUCResult.TIMEOUT
+        finally:
+            await self.generator.stop()
+
+    async def __enumerate__(self):
+        index = MUCIndex(self.certifier.mapping)
+        slots = asyncio.Semaphore(self.options.certifier_workers)
+
+        await self.generator.start()
+        while True:
+            self.writer.generator_restart(self.generator.horizon)
+            status, horizon = await self.__enumerate_horizon__(index, slots)
+
+            if horizon is not None:
+                await self.generator.set_horizon_and_restart(horizon)
+
+            if status is not MUS2MUCResult.RESTART:
+                return status
+
+    async def __certify__(self, mus, slots):
+        async with slots:
+            return await self.async_certifier.certify(mus)
+
+    async def __produce__(self, queue, index, slots):
+        # Starts certifying every MUS as soon as it is read. The queue is
+        # bounded, so that the generator is not read too far ahead of the
+        # results that are being applied.
+        submitted = set()
+        try:
+            while muses := await self.generator.get_muses():
+                for mus in muses:
+                    key = mus.conjuncts
+                    task = None
+                    if (
+                        not mus.empty
+                        and not index.dominates(mus)
+                        and key not in submitted
+                    ):
+                        submitted.add(key)
+                        task = asyncio.create_task(self.__certify__(mus, slots))
+
+                    try:
+                        await queue.put((mus, task))
+                    except asyncio.CancelledError:
+                        if task is not None:
+                            task.cancel()
+                        raise
+
+                    if mus.empty:
+                        return
+
+        except Exception as e:
+            # Raised by the consumer, which would otherwise wait forever.
+            await queue.put(e)
+            return
+
+        await queue.put(None)
+
+    async def __enumerate_horizon__(self, index, slots):
+        # Returns the outcome of the horizon, and the horizon to restart the
+        # generator from. The restart happens once nothing reads the
+        # generator anymore.
+        queue = asyncio.Queue(maxsize=self.options.certifier_workers)
+        producer = asyncio.create_task(self.__produce__(queue, index, slots))
+        tasks = []
+
+        try:
+            while (item := await queue.get()) is not None:
+                if isinstance(item, Exception):
+                    raise item
+
+                mus, task = item
+                if task is not None:
+                    tasks.append(task)
+
+                if mus.empty:
+                    return MUS2MUCResult.RESTART, self.__handle_empty_mus__(
+                        mus, self.generator.horizon
+                    )
+
+                if index.dominates(mus):
+                    self.writer.mus_is_skipped(mus)
+                    continue
+
+                self.writer.found_a_mus(mus)
+                certifier_result = await (
+                    task if task is not None else self.__certify__(mus, slots)
+                )
+
+                status, horizon = self.__handle_certifier_result__(
+                    mus, certifier_result, index
+                )
+                if status is not None:
+                    return status, horizon
+
+            await producer
+            return self.__completed__(), None
+
+        finally:
+            producer.cancel()
+            while not queue.empty():
+                item = queue.get_nowait()
+                if isinstance(item, tuple) and item[1] is not None:
+                    tasks.append(item[1])
+
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(producer, *tasks, return_exceptions=True)
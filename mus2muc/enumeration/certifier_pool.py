@@ -0,0 +1,28 @@
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from mus2muc.interfaces import MUS, Certifier, CertifierOutput
+
+
+class CertifierPool:
+    # Certifier calls spend their time waiting on an external solver process,
+    # so a thread pool is enough to keep several cores busy.
+    def __init__(self, certifier: Certifier, workers: int):
+        self.certifier = certifier
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="certifier"
+        )
+
+    def submit(self, mus: MUS) -> "Future[CertifierOutput]":
+        return self.executor.submit(self.certifier.certify, mus)
+
+    def cancel(self, futures: Iterable[Future]):
+        for future in futures:
+            future.cancel()
+
+        self.certifier.cancel()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.certifier.cancel()
@@ -0,0 +1,85 @@
+import enum
+
+from mus2muc.interfaces import MUS, ConjunctMapping
+from mus2muc.interfaces.model import iterate_bits
+
+
+class MUCRelation(enum.IntEnum):
+    UNRELATED = 0
+    EQUAL = 1
+    SUPERSET = 2
+    SUBSET = 3
+
+
+class MUCIndex:
+    # Exact index of the certified MUCs, stored as bitsets over the interned
+    # conjunct ids of a ConjunctMapping. Each conjunct keeps a posting bitset
+    # over the positions of the MUCs that contain it, so subset and superset
+    # queries only look at the MUCs sharing conjuncts with the candidate.
+    def __init__(self, mapping: ConjunctMapping):
+        self.mapping = mapping
+        self.mucs: dict[int, int] = {}
+        self.bitsets: list[int] = []
+        self.postings: list[int] = [0] * len(mapping)
+        self.all_mucs = 0
+
+    def __len__(self):
+        return len(self.mucs)
+
+    def __bitset__(self, mus: MUS) -> int:
+        return mus.conjuncts
+
+    def __has_muc_within__(self, bits: int) -> bool:
+        # Only the MUCs sharing a conjunct with `bits` can be subsets of it.
+        touching = 0
+        for c in iterate_bits(bits):
+            touching |= self.postings[c]
+
+        for position in iterate_bits(touching):
+            if self.bitsets[position] & ~bits == 0:
+                return True
+        return False
+
+    def __mucs_containing__(self, bits: int) -> int:
+        # MUCs that use every conjunct of `bits`.
+        containing = self.all_mucs
+        for c in iterate_bits(bits):
+            containing &= self.postings[c]
+            if containing == 0:
+                break
+        return containing
+
+    def relation(self, mus: MUS) -> MUCRelation:
+        bits = self.__bitset__(mus)
+        if bits in self.mucs:
+            return MUCRelation.EQUAL
+
+        if self.__has_muc_within__(bits):
+            return MUCRelation.SUPERSET
+
+        if bits != 0 and self.__mucs_containing__(bits) != 0:
+            return MUCRelation.SUBSET
+
+        return MUCRelation.UNRELATED
+
+    def contains(self, mus: MUS) -> bool:
+        return self.__bitset__(mus) in self.mucs
+
+    def dominates(self, mus: MUS) -> bool:
+        # A candidate that is equal to, or a superset of, a certified MUC is
+        # unsatisfiable but not minimal, hence not worth certifying.
+        bits = self.__bitset__(mus)
+        return bits in self.mucs or self.__has_muc_within__(bits)
+
+    def add_if_not_contained(self, mus: MUS) -> bool:
+        bits = self.__bitset__(mus)
+        if bits in self.mucs:
+            return False
+
+        position = len(self.bitsets)
+        self.mucs[bits] = position
+        self.bitsets.append(bits)
+        for c in iterate_bits(bits):
+            self.postings[c] |= 1 << position
+        self.all_mucs |= 1 << position
+        return True
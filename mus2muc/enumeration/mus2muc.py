@@ -1,12 +1,10 @@
+import enum
 import time
-from pathlib import Path
 
-from mus2muc.interfaces import ConjunctMapping, Certifier, MUSGenerator
-from mus2muc.generators import WASPGenerator, WASPGeneratorThread
-from mus2muc.enumeration.mus_cache import MUSCache
-from mus2muc.interfaces import Options, MUCWriter
-from mus2muc.utils import log, Logger
-import enum
+from mus2muc.enumeration.certifier_pool import CertifierPool
+from mus2muc.enumeration.muc_index import MUCIndex
+from mus2muc.interfaces import Certifier, MUCWriter, MUSGenerator, Options
+from mus2muc.utils import Logger, log
 
 
 class MUS2MUCResult(enum.IntEnum):
@@ -16,6 +14,7 @@ class MUS2MUCResult(enum.IntEnum):
     SOME_ERROR = 40
     RESTART = 50
     NEXT_BATCH = 60
+    INCOMPLETE = 70
 
 
 class MUS2MUC:
@@ -31,6 +30,10 @@ class MUS2MUC:
         self.generator = generator
         self.writer = writer
         self.found_mucs = 0
+        # MUSes the certifier could not decide, as long as no later
+        # certification decided them.
+        self.undecided: set[int] = set()
+        self.pool = None
 
     def timeout(self) -> bool:
         if self.options.total_timeout is None:
@@ -46,50 +49,138 @@ class MUS2MUC:
         return self.found_mucs >= self.options.total_mucs
 
     def start(self):
-        return self.enumerate_muses()
-
-    def __process_mus_batch__(self, mus_buffer, cache, k):
-        for mus in mus_buffer:
+        if self.options.certifier_workers > 1:
+            self.pool = CertifierPool(self.certifier, self.options.certifier_workers)
+
+        try:
+            return self.enumerate_muses()
+        finally:
+            self.generator.kill()
+            if self.pool is not None:
+                self.pool.shutdown()
+            self.certifier.close()
+
+    def __submit_mus_batch__(self, mus_buffer, index):
+        # Starts certifying every MUS of the batch in the pool. The batch is
+        # topped up with the MUSes that are already waiting in the generator,
+        # so that idle workers are not left waiting for the next batch.
+        pending = {}
+        submitted = set()
+        idx = 0
+
+        while True:
+            while idx < len(mus_buffer):
+                mus = mus_buffer[idx]
+                if mus.empty:
+                    return pending
+
+                key = mus.conjuncts
+                if not index.dominates(mus) and key not in submitted:
+                    submitted.add(key)
+                    pending[idx] = self.pool.submit(mus)
+                idx += 1
+
+            if len(pending) >= self.pool.workers:
+                return pending
+
+            more_muses = self.generator.poll_muses()
+            if len(more_muses) == 0:
+                return pending
+
+            mus_buffer.extend(more_muses)
+
+    def __process_mus_batch__(self, mus_buffer, index):
+        mus_buffer = list(mus_buffer)
+        pending = (
+            self.__submit_mus_batch__(mus_buffer, index)
+            if self.pool is not None
+            else {}
+        )
+
+        try:
+            return self.__apply_mus_batch__(mus_buffer, pending, index)
+        finally:
+            if len(pending) > 0:
+                self.pool.cancel(pending.values())
+
+    def __handle_empty_mus__(self, mus, k):
+        log("Found the empty MUS, doubling horizon")
+        self.writer.found_empty_mus(mus)
+        return k * 2
+
+    def __handle_certifier_result__(self, mus, certifier_result, index):
+        # Returns the outcome of the certification, if it ends the batch, and
+        # the horizon to restart the generator from, if any.
+        if certifier_result.unknown:
+            # Undecided, e.g. on a certifier timeout: the MUS is reported and
+            # the enumeration goes on without it.
+            log("The certifier could not decide the MUS, skipping it")
+            self.writer.mus_is_unknown(mus, certifier_result)
+            self.undecided.add(mus.conjuncts)
+            return None, None
+
+        self.undecided.discard(mus.conjuncts)
+        if certifier_result.satisfiable:
+            self.writer.mus_is_a_false_positive(mus, certifier_result)
+            assert certifier_result.witness_model_length is not None
+            k = certifier_result.witness_model_length
+            log(f"Expanding horizon to {k=}")
+            return MUS2MUCResult.RESTART, k
+
+        elif certifier_result.unsatisfiable:
+            self.writer.mus_is_a_muc(mus, certifier_result)
+            index.add_if_not_contained(mus)
+            self.generator.block(mus)
+            self.found_mucs += 1
+
+            if self.found_required_mucs():
+                log("Found required number of MUCs")
+                return MUS2MUCResult.FOUND_REQUIRED_MUCS, None
+
+        return None, None
+
+    def __apply_mus_batch__(self, mus_buffer, pending, index):
+        # Results are applied in generation order, regardless of the order in
+        # which pooled certifications complete.
+        for idx, mus in enumerate(mus_buffer):
             if mus.empty:
-                log("Found the empty MUS, doubling horizon")
-                self.generator.set_horizon_and_restart(k * 2)
-
-                self.writer.found_empty_mus(mus)
+                self.generator.set_horizon_and_restart(
+                    self.__handle_empty_mus__(mus, self.generator.horizon)
+                )
                 return MUS2MUCResult.RESTART
 
-            if cache.contains(mus):
+            if index.dominates(mus):
                 self.writer.mus_is_skipped(mus)
                 continue
 
             self.writer.found_a_mus(mus)
-            certifier_result = self.certifier.certify(mus)
-
-            if certifier_result.unknown:
-                return MUS2MUCResult.SOME_ERROR
-
-            elif certifier_result.satisfiable:
-                self.writer.mus_is_a_false_positive(mus, certifier_result)
-                assert certifier_result.witness_model_length is not None
-                k = certifier_result.witness_model_length
-                log(f"Expanding horizon to {k=}")
-                self.generator.set_horizon_and_restart(k)
+            certifier_result = (
+                pending.pop(idx).result()
+                if idx in pending
+                else self.certifier.certify(mus)
+            )
 
-                return MUS2MUCResult.RESTART
-
-            elif certifier_result.unsatisfiable:
-                self.writer.mus_is_a_muc(mus, certifier_result)
-                cache.add_if_not_contained(mus)
-                self.found_mucs += 1
+            status, horizon = self.__handle_certifier_result__(
+                mus, certifier_result, index
+            )
+            if horizon is not None:
+                self.generator.set_horizon_and_restart(horizon)
 
-                if self.found_required_mucs():
-                    log("Found required number of MUCs")
-                    return MUS2MUCResult.FOUND_REQUIRED_MUCS
+            if status is not None:
+                return status
 
         return MUS2MUCResult.NEXT_BATCH
 
+    def __completed__(self):
+        # The enumeration ran to the end: all the MUCs were found unless
+        # some MUSes were left undecided.
+        if len(self.undecided) > 0:
+            log(f"{len(self.undecided)} MUSes were left undecided")
+            return MUS2MUCResult.INCOMPLETE
+        return MUS2MUCResult.FOUND_ALL_MUCS
+
     def enumerate_muses(self):
-        cache = MUSCache()
-        k = self.options.k_start
+        index = MUCIndex(self.certifier.mapping)
         continue_search = True
 
         self.generator.start()
@@ -103,7 +194,7 @@ class MUS2MUC:
                     log("Timeout reached!")
                     return MUS2MUCResult.TIMEOUT
 
-                status = self.__process_mus_batch__(mus_buffer, cache, k)
+                status = self.__process_mus_batch__(mus_buffer, index)
 
                 if status is MUS2MUCResult.NEXT_BATCH:
                     continue
@@ -115,6 +206,5 @@ class MUS2MUC:
                 else:
                     return status
 
-
         self.generator.kill()
-        return MUS2MUCResult.FOUND_ALL_MUCS
+        return self.__completed__()
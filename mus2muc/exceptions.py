@@ -11,3 +11,7 @@ class UnsupportedOperator(Exception):
 
     def message(self) -> str:
         return self.string
+
+
+class GroundingError(Exception):
+    pass
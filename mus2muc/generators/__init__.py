@@ -1,2 +1,7 @@
 from .wasp import WASPGenerator
-from .wasp_threaded import WASPGeneratorThread
\ No newline at end of file
+from .wasp_threaded import WASPGeneratorThread
+from .wasp_ensemble import WASPEnsembleGenerator
+from .clingo_incremental import ClingoIncrementalGenerator
+from .wasp_async import AsyncWASPGenerator
+from .grounder import Grounder
+from .ground_cache import GroundCache
@@ -0,0 +1,240 @@
+from collections.abc import Sequence
+from pathlib import Path
+from time import perf_counter
+
+import clingo
+
+from mus2muc.constants import Constants
+from mus2muc.interfaces import MUS, ConjunctMapping, MUSGenerator
+from mus2muc.interfaces.model import iterate_bits
+from mus2muc.utils import Logger, log
+
+
+class MapSolver:
+    # Keeps track of the explored subsets of conjuncts, as in MARCO: each
+    # model is a seed that is neither a superset of a known MUS nor a subset
+    # of a known satisfiable set. Blocks on MUSes are guarded by an external
+    # atom, so that they can be lifted when the horizon is extended.
+    def __init__(self, size: int):
+        self.ctl = clingo.Control(["--heuristic=Domain", "--warn=none"])
+        self.ctl.add(
+            "base",
+            [],
+            f"elem(0..{size - 1}). {{ e(I): elem(I) }}. #heuristic e(I): elem(I). [1, true]",
+        )
+        self.ctl.ground([("base", [])])
+        self.literals = [
+            self.ctl.symbolic_atoms[clingo.Function("e", [clingo.Number(i)])].literal
+            for i in range(size)
+        ]
+        self.size = size
+        self.guards: dict[frozenset[int], int] = {}
+
+    def seed(self) -> frozenset[int] | None:
+        with self.ctl.solve(yield_=True) as handle:
+            for model in handle:
+                return frozenset(
+                    i for i, lit in enumerate(self.literals) if model.is_true(lit)
+                )
+        return None
+
+    def block_down(self, satisfiable: frozenset[int]):
+        with self.ctl.backend() as backend:
+            backend.add_rule(
+                [],
+                [-self.literals[i] for i in range(self.size) if i not in satisfiable],
+            )
+
+    def block_up(self, mus: frozenset[int]):
+        with self.ctl.backend() as backend:
+            guard = backend.add_atom()
+            backend.add_external(guard, clingo.TruthValue.True_)
+            backend.add_rule([], [guard, *(self.literals[i] for i in mus)])
+        self.guards[mus] = guard
+
+    def block_up_permanently(self, mus: frozenset[int]):
+        if mus in self.guards:
+            # The guard is never released.
+            del self.guards[mus]
+            return
+
+        with self.ctl.backend() as backend:
+            backend.add_rule([], [self.literals[i] for i in mus])
+
+    def unblock_up(self, mus: frozenset[int]):
+        self.ctl.assign_external(self.guards.pop(mus), False)
+
+    def blocked_up(self) -> list[frozenset[int]]:
+        return list(self.guards)
+
+
+class ClingoIncrementalGenerator(MUSGenerator):
+    # Enumerates MUSes in-process, on a single clingo.Control grounded with
+    # the multi-shot encoding. Extending the horizon grounds only the new
+    # time steps; satisfiable sets stay blocked in the map solver, and MUSes
+    # that are still unsatisfiable at the new horizon stay blocked as well.
+    def __init__(
+        self,
+        k: int,
+        annotated_program: str,
+        encoding_path: Path,
+        mapping: ConjunctMapping,
+    ):
+        super().__init__(k)
+        self.ctl = clingo.Control(["--warn=none"])
+        self.ctl.add("base", [], annotated_program + "\n" + encoding_path.read_text())
+        self.ctl.ground([("base", [])])
+
+        self.elements: list[clingo.Symbol] = sorted(
+            atom.symbol
+            for atom in self.ctl.symbolic_atoms.by_signature(
+                Constants.MUS_PREDICATE_NAME, 1
+            )
+        )
+        # Elements are ordered by symbol; MUSes are bitsets over conjunct ids.
+        self.element_ids: list[int] = [
+            mapping.ids[x.arguments[0].string] for x in self.elements
+        ]
+        self.element_index: dict[int, int] = {
+            c: i for i, c in enumerate(self.element_ids)
+        }
+        self.grounded_steps = 0
+        self.active_horizon: int | None = None
+        self.map = MapSolver(len(self.elements))
+        self.replay: list[MUS] = []
+        self.exhausted = False
+        self.last_mus = perf_counter()
+        self.__extend_horizon__(k)
+
+    def __extend_horizon__(self, h: int):
+        while self.grounded_steps < h:
+            self.ctl.ground([("step", [clingo.Number(self.grounded_steps)])])
+            self.grounded_steps += 1
+
+        if self.active_horizon is not None:
+            self.ctl.assign_external(self.__horizon_atom__(self.active_horizon), False)
+        self.ctl.assign_external(self.__horizon_atom__(h), True)
+        self.active_horizon = h
+
+    def __horizon_atom__(self, h: int) -> clingo.Symbol:
+        return clingo.Function("horizon", [clingo.Number(h - 1)])
+
+    def __solve__(self, subset: frozenset[int]) -> tuple[bool, set[int], set[int]]:
+        # Returns satisfiability, plus the elements true in the model if the
+        # subset is satisfiable, or the elements of an unsat core otherwise.
+        assumptions = [(self.elements[i], True) for i in subset]
+        literals = {
+            self.ctl.symbolic_atoms[self.elements[i]].literal: i for i in subset
+        }
+        model_elements: set[int] = set()
+        core_elements: set[int] = set()
+
+        def on_model(model):
+            model_elements.update(
+                i for i, x in enumerate(self.elements) if model.contains(x)
+            )
+
+        def on_core(core):
+            core_elements.update(literals[lit] for lit in core if lit in literals)
+
+        result = self.ctl.solve(
+            assumptions=assumptions, on_model=on_model, on_core=on_core
+        )
+        if result.satisfiable:
+            return True, model_elements, set()
+        return False, set(), core_elements
+
+    def __grow__(self, subset: set[int]) -> frozenset[int]:
+        for i in range(len(self.elements)):
+            if i in subset:
+                continue
+            satisfiable, model_elements, _ = self.__solve__(frozenset(subset | {i}))
+            if satisfiable:
+                subset |= model_elements | {i}
+        return frozenset(subset)
+
+    def __shrink__(self, core: set[int]) -> frozenset[int]:
+        mus = set(core)
+        for i in sorted(core):
+            if i not in mus:
+                continue
+            satisfiable, _, smaller_core = self.__solve__(frozenset(mus - {i}))
+            if not satisfiable:
+                mus = smaller_core
+        return frozenset(mus)
+
+    def __elements__(self, conjuncts: int) -> frozenset[int]:
+        return frozenset(self.element_index[c] for c in iterate_bits(conjuncts))
+
+    def block(self, mus: MUS):
+        # Certified MUCs are unsatisfiable at every horizon: they are blocked
+        # in the map solver for good, and never replayed.
+        super().block(mus)
+        self.map.block_up_permanently(self.__elements__(mus.conjuncts))
+
+    def __make_mus__(self, elements: frozenset[int]) -> MUS:
+        now = perf_counter()
+        compute_time = now - self.last_mus
+        self.last_mus = now
+        return MUS(
+            self.horizon,
+            sum(1 << self.element_ids[i] for i in elements),
+            now - Logger.start,
+            compute_time,
+        )
+
+    def __next_mus__(self) -> MUS | None:
+        while (seed := self.map.seed()) is not None:
+            satisfiable, model_elements, core = self.__solve__(seed)
+            if satisfiable:
+                self.map.block_down(self.__grow__(set(seed) | model_elements))
+                continue
+
+            mus = self.__shrink__(core)
+            self.map.block_up(mus)
+            return self.__make_mus__(mus)
+
+        return None
+
+    def set_horizon_and_restart(self, h: int):
+        if h < self.horizon:
+            # Sets that were satisfiable at a larger horizon may not be
+            # satisfiable anymore: the explored subsets are forgotten.
+            self.map = MapSolver(len(self.elements))
+            for muc in self.blocked:
+                self.map.block_up_permanently(self.__elements__(muc))
+
+        self.horizon = h
+        self.__extend_horizon__(h)
+        self.exhausted = False
+        self.last_mus = perf_counter()
+
+        # MUSes found at a smaller horizon are still MUSes if they are still
+        # unsatisfiable. They are kept blocked and replayed to the caller,
+        # since they have not been certified yet.
+        still_unsat = []
+        for mus in self.map.blocked_up():
+            satisfiable, _, _ = self.__solve__(mus)
+            if satisfiable:
+                self.map.unblock_up(mus)
+            else:
+                still_unsat.append(mus)
+
+        self.replay = [self.__make_mus__(mus) for mus in still_unsat]
+        log(f"Extended horizon to k={h}, {len(still_unsat)} MUSes kept blocked")
+
+    def get_muses(self) -> Sequence[MUS]:
+        if len(self.replay) > 0:
+            replay = tuple(self.replay)
+            self.replay.clear()
+            return replay
+
+        if self.exhausted:
+            return ()
+
+        mus = self.__next_mus__()
+        if mus is None:
+            self.exhausted = True
+            return ()
+
+        return (mus,)
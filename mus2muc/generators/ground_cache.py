@@ -0,0 +1,58 @@
+import os
+from hashlib import sha256
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+from mus2muc.utils import log
+
+
+class GroundCache:
+    # Content-addressed store of ground programs: each file is named after
+    # the hash of the probe program and of the horizon. Reading a file
+    # refreshes its modification time, and the least recently used files
+    # are removed once the store grows past `max_bytes`. Files are written
+    # to a temporary name and renamed, so that concurrent runs sharing the
+    # folder never read a partial program.
+    def __init__(self, folder: Path, max_bytes: int):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(probe: bytes, k: int) -> str:
+        return sha256(probe + f"\0k={k}".encode("ascii")).hexdigest()
+
+    def __path__(self, key: str) -> Path:
+        return self.folder / f"{key}.smodels"
+
+    def get(self, key: str) -> bytes | None:
+        path = self.__path__(key)
+        try:
+            ground_program = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return ground_program
+
+    def put(self, key: str, ground_program: bytes):
+        with NamedTemporaryFile(dir=self.folder, suffix=".tmp", delete=False) as f:
+            f.write(ground_program)
+        os.replace(f.name, self.__path__(key))
+        self.__evict__()
+
+    def __evict__(self):
+        entries = []
+        for path in self.folder.glob("*.smodels"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda x: x[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            log(f"Evicted {path.name} from the ground program cache")
@@ -0,0 +1,123 @@
+import os
+from collections.abc import Callable
+from pathlib import Path
+from subprocess import DEVNULL, PIPE, Popen
+from tempfile import TemporaryFile
+from threading import Thread
+from time import perf_counter
+from typing import BinaryIO
+
+from mus2muc.exceptions import GroundingError
+from mus2muc.generators.ground_cache import GroundCache
+from mus2muc.metrics import metrics
+
+
+class Grounder:
+    # Grounds the probe program with gringo, in smodels format. The probe is
+    # either a file, or a program kept in memory and sent over stdin. The
+    # ground program is streamed to wasp as gringo prints it, from the
+    # process or thread that feeds wasp, so that grounding overlaps with
+    # solving. Restarts only extend the horizon within a run: ground
+    # programs are reused through the GroundCache, which is shared with
+    # other runs on the same probe program, and bounded.
+    CHUNK_SIZE = 2**16
+
+    def __init__(self, probe: Path | str, cache: GroundCache | None = None):
+        self.probe = probe
+        self.cache = cache
+
+    @property
+    def in_memory(self) -> bool:
+        return isinstance(self.probe, str)
+
+    def __command__(self, k: int) -> list[str]:
+        source = "-" if self.in_memory else self.probe.as_posix()
+        return ["gringo", "-o", "smodels", "-c", f"k={k}", source]
+
+    def __probe_bytes__(self) -> bytes:
+        return self.probe.encode("utf-8") if self.in_memory else self.probe.read_bytes()
+
+    def __feed_probe__(self, gringo: Popen):
+        try:
+            gringo.stdin.write(self.__probe_bytes__())
+            gringo.stdin.close()
+        except (BrokenPipeError, ValueError):
+            pass
+
+    def __run_gringo__(
+        self,
+        k: int,
+        sink: BinaryIO,
+        keep: bool,
+        spawned: Callable[[Popen], None] | None,
+    ) -> bytes | None:
+        # Returns the ground program if `keep`. gringo's stderr goes to a
+        # file, so that its warnings cannot fill a pipe while its output is
+        # read.
+        chunks = []
+        with TemporaryFile() as errors:
+            gringo = Popen(
+                self.__command__(k),
+                stdin=PIPE if self.in_memory else DEVNULL,
+                stdout=PIPE,
+                stderr=errors,
+            )
+            try:
+                if spawned is not None:
+                    spawned(gringo)
+                if self.in_memory:
+                    Thread(
+                        target=self.__feed_probe__, args=(gringo,), daemon=True
+                    ).start()
+
+                fd = gringo.stdout.fileno()
+                while chunk := os.read(fd, self.CHUNK_SIZE):
+                    sink.write(chunk)
+                    if keep:
+                        chunks.append(chunk)
+                returncode = gringo.wait()
+            finally:
+                if gringo.poll() is None:
+                    gringo.kill()
+                    gringo.wait()
+                gringo.stdout.close()
+
+            if returncode != 0:
+                errors.seek(0)
+                raise GroundingError(errors.read().decode("utf-8", errors="replace"))
+
+        return b"".join(chunks) if keep else None
+
+    def stream(
+        self, k: int, sink: BinaryIO, spawned: Callable[[Popen], None] | None = None
+    ) -> float | None:
+        # Writes the ground program of horizon `k` to `sink`. Returns the time
+        # spent in gringo, or None if the program came from the cache; the
+        # process running wasp's generator reports it with `record`. The
+        # gringo process is passed to `spawned`, e.g. to kill it from another
+        # thread.
+        if self.cache is None:
+            start = perf_counter()
+            self.__run_gringo__(k, sink, keep=False, spawned=spawned)
+            return perf_counter() - start
+
+        key = GroundCache.key(self.__probe_bytes__(), k)
+        ground_program = self.cache.get(key)
+        if ground_program is not None:
+            sink.write(ground_program)
+            return None
+
+        start = perf_counter()
+        ground_program = self.__run_gringo__(k, sink, keep=True, spawned=spawned)
+        elapsed = perf_counter() - start
+        self.cache.put(key, ground_program)
+        return elapsed
+
+    def record(self, k: int, seconds: float | None):
+        if seconds is None:
+            metrics.count("ground_cache_hits")
+            return
+
+        metrics.add_time("grounding", seconds, k=k)
+        if self.cache is not None:
+            metrics.count("ground_cache_misses")
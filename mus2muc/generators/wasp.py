@@ -1,46 +1,48 @@
-from time import perf_counter
-from typing import Optional, Sequence
-from mus2muc.interfaces import MUSGenerator
+from collections.abc import Sequence
+from subprocess import PIPE, Popen
+from threading import Thread
+
 from mus2muc.constants import Constants
-from pathlib import Path
-from subprocess import Popen, PIPE
-from clingo import parse_term
-from mus2muc.interfaces import MUS
-from mus2muc.utils import Logger
+from mus2muc.exceptions import GroundingError
+from mus2muc.generators.grounder import Grounder
+from mus2muc.generators.wasp_output import WaspOutputParser
+from mus2muc.interfaces import MUS, ConjunctMapping, MUSGenerator
 
 
 class WASPGenerator(MUSGenerator):
-    def __init__(self, k: int, logic_program_file_path: Path, bin_folder):
+    def __init__(
+        self, k: int, grounder: Grounder, mapping: ConjunctMapping, bin_folder
+    ):
         super().__init__(k)
-        self.filepath = logic_program_file_path
+        self.grounder = grounder
         self.bin_folder = bin_folder
+        self.parser = WaspOutputParser(mapping)
+        self.grounding_error: GroundingError | None = None
         self.g = self.__call_wasp__()
 
-    def __parse_mus__(self, wasp_line_output: str) -> Optional[MUS]:
-        # TODO: Parsing the time-stamp
-        if not wasp_line_output.startswith("[MUS #"):
-            return None
-
-        timestamp, atoms = wasp_line_output.split(': ')
-        mus_atoms = [parse_term(x) for x in atoms.split(" ")]
+    def __parse_mus__(self, wasp_line_output: bytes) -> MUS | None:
+        return self.parser.parse(wasp_line_output, self.horizon)
 
-        timestamp = int(timestamp.split('] ')[1])
+    def __feed__(self, wasp: Popen, k: int):
+        # The ground program is streamed to wasp as gringo prints it.
+        try:
+            self.grounder.record(k, self.grounder.stream(k, wasp.stdin))
+        except GroundingError as e:
+            self.grounding_error = e
+        except (BrokenPipeError, ValueError):
+            pass
 
-        rbracket_idx = wasp_line_output.find("]")
-        # [MUS #3] 53487: a b c x y z
-        return MUS(
-            self.horizon,
-            tuple(x.arguments[0].string for x in mus_atoms),
-            perf_counter() - Logger.start,
-            timestamp / 1000
-        )
+        try:
+            wasp.stdin.close()
+        except (BrokenPipeError, ValueError):
+            pass
 
     def get_muses(self) -> Sequence[MUS]:
         try:
             mus = next(self.g)
             return (mus,)
         except StopIteration:
-            return tuple()
+            return ()
 
     def set_horizon_and_restart(self, h: int):
         self.horizon = h
@@ -48,15 +50,6 @@ class WASPGenerator(MUSGenerator):
         self.g = self.__call_wasp__()
 
     def __call_wasp__(self):
-        gringo_cmd = [
-            "gringo",
-            "-o",
-            "smodels",
-            "-c",
-            f"k={self.horizon}",
-            self.filepath.as_posix(),
-        ]
-
         wasp_cmd = [
             self.bin_folder / "wasp",
             f"--mus={Constants.MUS_PREDICATE_NAME}",
@@ -64,16 +57,20 @@ class WASPGenerator(MUSGenerator):
             "0",
         ]
 
-        gringo = Popen(gringo_cmd, stdout=PIPE, stderr=PIPE)
-        wasp = Popen(wasp_cmd, stdin=gringo.stdout, stderr=PIPE, stdout=PIPE)
+        wasp = Popen(wasp_cmd, stdin=PIPE, stderr=PIPE, stdout=PIPE)
+        feeder = Thread(target=self.__feed__, args=(wasp, self.horizon), daemon=True)
+        feeder.start()
 
         try:
             for row, line in enumerate(wasp.stdout):
-                line = line.strip().decode("ascii")
-                mus = self.__parse_mus__(line)
-                if mus is not None:
+                mus = self.__parse_mus__(line.strip())
+                if mus is not None and mus.conjuncts not in self.blocked:
                     yield mus
 
+            feeder.join()
+            if self.grounding_error is not None:
+                raise self.grounding_error
+
         except GeneratorExit:
             wasp.terminate()
 
@@ -0,0 +1,134 @@
+import asyncio
+import os
+from asyncio.subprocess import DEVNULL, PIPE
+from collections.abc import Sequence
+from pathlib import Path
+from subprocess import Popen
+from time import perf_counter
+from typing import BinaryIO
+
+from mus2muc.constants import Constants
+from mus2muc.generators.grounder import Grounder
+from mus2muc.generators.wasp_output import WaspOutputParser
+from mus2muc.interfaces import MUS, AsyncMUSGenerator, ConjunctMapping
+from mus2muc.metrics import metrics
+
+
+class GringoFeed:
+    # The grounding of one horizon, streamed to wasp by a worker thread. The
+    # thread cannot be cancelled while gringo grounds: `kill` stops it by
+    # killing gringo, now or as soon as it is spawned.
+    def __init__(self):
+        self.killed = False
+        self.gringo: Popen | None = None
+
+    def spawned(self, gringo: Popen):
+        self.gringo = gringo
+        if self.killed:
+            gringo.kill()
+
+    def kill(self):
+        self.killed = True
+        if self.gringo is not None:
+            self.gringo.kill()
+
+
+class AsyncWASPGenerator(AsyncMUSGenerator):
+    # wasp runs as an asyncio subprocess, fed through a pipe with the ground
+    # program of the current horizon, which a worker thread streams from
+    # gringo; the MUSes are read from its stdout on the event loop,
+    # as soon as they are printed, instead of going through a WaspRunner
+    # process and its queue.
+    def __init__(
+        self, k: int, grounder: Grounder, mapping: ConjunctMapping, bin_folder: Path
+    ):
+        super().__init__(k)
+        self.grounder = grounder
+        self.bin_folder = bin_folder
+        self.feeder: asyncio.Task | None = None
+        self.feed: GringoFeed | None = None
+        self.wasp: asyncio.subprocess.Process | None = None
+        self.exhausted = False
+        self.parser = WaspOutputParser(mapping)
+        self.started_at: float | None = None
+
+    async def start(self):
+        wasp_cmd = [
+            self.bin_folder / "wasp",
+            f"--mus={Constants.MUS_PREDICATE_NAME}",
+            "-n",
+            "0",
+        ]
+
+        read_end, write_end = os.pipe()
+        self.started_at = perf_counter()
+        try:
+            self.wasp = await asyncio.create_subprocess_exec(
+                *wasp_cmd, stdin=read_end, stdout=PIPE, stderr=DEVNULL
+            )
+        except BaseException:
+            os.close(write_end)
+            raise
+        finally:
+            os.close(read_end)
+
+        self.feed = GringoFeed()
+        self.feeder = asyncio.create_task(
+            asyncio.to_thread(
+                self.__feed__, open(write_end, "wb"), self.horizon, self.feed
+            )
+        )
+        self.exhausted = False
+
+    def __feed__(self, sink: BinaryIO, k: int, feed: GringoFeed):
+        # Runs in a worker thread. A GroundingError is raised by get_muses,
+        # once wasp's output ends.
+        try:
+            self.grounder.record(k, self.grounder.stream(k, sink, feed.spawned))
+        except BrokenPipeError:
+            pass
+        finally:
+            try:
+                sink.close()
+            except BrokenPipeError:
+                pass
+
+    def kill(self):
+        if self.feed is not None:
+            self.feed.kill()
+        if self.feeder is not None:
+            self.feeder.cancel()
+        if self.wasp is not None and self.wasp.returncode is None:
+            self.wasp.kill()
+
+    async def stop(self):
+        self.kill()
+        if self.wasp is not None:
+            await self.wasp.wait()
+        if self.feeder is not None:
+            await asyncio.gather(self.feeder, return_exceptions=True)
+
+    async def set_horizon_and_restart(self, h: int):
+        await self.stop()
+        self.horizon = h
+        await self.start()
+
+    async def get_muses(self) -> Sequence[MUS]:
+        while not self.exhausted:
+            line = await self.wasp.stdout.readline()
+            if len(line) == 0:
+                self.exhausted = True
+                await self.wasp.wait()
+                await self.feeder
+                break
+
+            mus = self.parser.parse(line.strip(), self.horizon)
+            if mus is not None and self.started_at is not None:
+                metrics.add_time(
+                    "wasp_first_mus", perf_counter() - self.started_at, k=self.horizon
+                )
+                self.started_at = None
+            if mus is not None and mus.conjuncts not in self.blocked:
+                return (mus,)
+
+        return ()
@@ -0,0 +1,187 @@
+from collections import defaultdict
+from collections.abc import Sequence
+from pathlib import Path
+from queue import Empty, Queue
+from threading import Thread
+from time import perf_counter
+
+from mus2muc.generators.grounder import Grounder
+from mus2muc.generators.wasp_threaded import WaspRunner
+from mus2muc.interfaces import MUS, ConjunctMapping, MUSGenerator
+from mus2muc.metrics import metrics
+from mus2muc.utils import log
+
+# A batch of MUSes, or the error that ended its runner.
+Batch = tuple[MUS, ...] | Exception
+
+
+class WASPEnsembleGenerator(MUSGenerator):
+    # Runs `width` WaspRunners at once, at horizons k, k*factor,
+    # k*factor^2, ... and merges their MUS streams, smallest horizon first.
+    # The smallest horizon is the one the enumeration relies on: when it is
+    # exhausted, the enumeration is complete. On restart, the runners below
+    # the new horizon are killed, and the smallest surviving runner is
+    # promoted without waiting for a fresh wasp to ramp up. The batches of
+    # all the runners are forwarded to a single queue, which is waited on.
+    def __init__(
+        self,
+        k: int,
+        grounder: Grounder,
+        mapping: ConjunctMapping,
+        bin_folder: Path,
+        width: int = 3,
+        factor: int = 2,
+        batch_size: int = 32,
+        batch_latency: float = 0.02,
+    ):
+        super().__init__(k)
+        self.grounder = grounder
+        self.mapping = mapping
+        self.bin_folder = bin_folder
+        self.width = width
+        self.factor = factor
+        self.batch_size = batch_size
+        self.batch_latency = batch_latency
+        self.runners: dict[int, WaspRunner] = {}
+        self.finished: set[int] = set()
+        # MUSes handed out by each runner that may have to be handed out
+        # again after a restart, by conjuncts; certified MUCs are removed.
+        self.delivered: dict[int, dict[int, MUS]] = {}
+        self.arrivals: Queue[tuple[WaspRunner, Batch]] = Queue()
+        self.replay: list[MUS] = []
+        self.started = False
+        self.started_at: dict[int, float] = {}
+        self.__fill__()
+
+    def __fill__(self):
+        horizons = [self.horizon * self.factor**i for i in range(self.width)]
+        for h in horizons:
+            if h in self.runners:
+                continue
+
+            self.runners[h] = WaspRunner(
+                h,
+                self.grounder,
+                self.bin_folder,
+                self.mapping,
+                self.blocked,
+                self.batch_size,
+                self.batch_latency,
+            )
+            self.delivered[h] = {}
+            if self.started:
+                self.__start_runner__(h)
+
+    def __start_runner__(self, h: int):
+        self.started_at[h] = perf_counter()
+        self.runners[h].start()
+        Thread(target=self.__forward__, args=(self.runners[h],), daemon=True).start()
+
+    def __forward__(self, runner: WaspRunner):
+        # Moves the batches of a runner to `arrivals`, up to its last batch,
+        # or up to its error, which is raised by the reader.
+        while True:
+            try:
+                mus_buffer = runner.receive()
+            except Exception as e:
+                self.arrivals.put((runner, e))
+                return
+
+            self.arrivals.put((runner, mus_buffer))
+            if len(mus_buffer) == 0:
+                return
+
+    def start(self):
+        self.started = True
+        for h in self.runners:
+            self.__start_runner__(h)
+
+    def kill(self):
+        for runner in self.runners.values():
+            runner.kill()
+        self.runners.clear()
+
+    def block(self, mus: MUS):
+        super().block(mus)
+        for delivered in self.delivered.values():
+            delivered.pop(mus.conjuncts, None)
+
+    def set_horizon_and_restart(self, h: int):
+        for horizon in [x for x in self.runners if x < h]:
+            self.runners.pop(horizon).kill()
+            self.started_at.pop(horizon, None)
+            self.finished.discard(horizon)
+            del self.delivered[horizon]
+
+        # The surviving runners may have delivered MUSes that were dropped by
+        # the caller when it restarted: all the MUSes they delivered, except
+        # for certified MUCs, are handed out again.
+        self.replay = [
+            mus
+            for horizon in sorted(self.runners)
+            for mus in self.delivered[horizon].values()
+        ]
+
+        # The smallest runner at a horizon of at least h is promoted, or a
+        # new one is spawned at h.
+        self.horizon = min((x for x in self.runners if x >= h), default=h)
+        log(f"Promoting horizon k={self.horizon}")
+        self.__fill__()
+
+    def __receive__(
+        self, runner: WaspRunner, mus_buffer: Batch, received: dict[int, list[MUS]]
+    ):
+        horizon = runner.k
+        if self.runners.get(horizon) is not runner:
+            # A batch sent before the runner was killed.
+            return
+
+        runner.report_grounding()
+        if isinstance(mus_buffer, Exception):
+            raise mus_buffer
+        if len(mus_buffer) == 0:
+            self.finished.add(horizon)
+            return
+        if horizon in self.started_at:
+            metrics.add_time(
+                "wasp_first_mus",
+                perf_counter() - self.started_at.pop(horizon),
+                k=horizon,
+            )
+        received[horizon].extend(mus_buffer)
+        for mus in mus_buffer:
+            self.delivered[horizon][mus.conjuncts] = mus
+
+    def __collect__(self, block: bool = False) -> list[MUS]:
+        # With `block`, waits for a batch if there is nothing to hand out.
+        muses = self.replay
+        self.replay = []
+        received: dict[int, list[MUS]] = defaultdict(list)
+        wait = block and len(muses) == 0
+        while True:
+            try:
+                if wait:
+                    with metrics.timed("generator_queue_wait"):
+                        runner, mus_buffer = self.arrivals.get()
+                else:
+                    runner, mus_buffer = self.arrivals.get_nowait()
+            except Empty:
+                break
+
+            wait = False
+            self.__receive__(runner, mus_buffer, received)
+
+        for horizon in sorted(received):
+            muses.extend(received[horizon])
+        return muses
+
+    def poll_muses(self) -> Sequence[MUS]:
+        return tuple(self.__collect__())
+
+    def get_muses(self) -> Sequence[MUS]:
+        while len(self.runners) > 0:
+            muses = self.__collect__(block=self.horizon not in self.finished)
+            if len(muses) > 0 or self.horizon in self.finished:
+                return tuple(muses)
+
+        return ()
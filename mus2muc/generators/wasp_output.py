@@ -0,0 +1,73 @@
+from time import perf_counter
+
+from clingo import parse_term
+
+from mus2muc.constants import Constants
+from mus2muc.interfaces import MUS, ConjunctMapping
+from mus2muc.utils import Logger
+
+
+def parse_mus_line(
+    wasp_line_output: str, horizon: int, mapping: ConjunctMapping
+) -> MUS | None:
+    # [MUS #3] 53487: a b c x y z
+    if not wasp_line_output.startswith("[MUS #"):
+        return None
+
+    timestamp, _, atoms = wasp_line_output.partition(":")
+    mus_atoms = [parse_term(x) for x in atoms.split()]
+
+    timestamp = int(timestamp.split("] ")[1])
+
+    return MUS(
+        horizon,
+        mapping.bitset(x.arguments[0].string for x in mus_atoms),
+        perf_counter() - Logger.start,
+        timestamp / 1000,
+    )
+
+
+class WaspOutputParser:
+    # Parses MUS lines straight from the bytes printed by wasp into bitsets
+    # over the conjunct ids of the mapping. The atoms wasp prints for plain
+    # labels are known in advance; any other atom is decoded once by
+    # clingo.parse_term, and then looked up like the others.
+    PREFIX = b"[MUS #"
+    ATOM_PREFIX = f'{Constants.MUS_PREDICATE_NAME}("'
+    ATOM_SUFFIX = '")'
+
+    def __init__(self, mapping: ConjunctMapping):
+        self.mapping = mapping
+        self.bits: dict[bytes, int] = {
+            (self.ATOM_PREFIX + label + self.ATOM_SUFFIX).encode("utf-8"): 1 << i
+            for i, label in enumerate(mapping.labels)
+            if "\\" not in label and '"' not in label
+        }
+
+    def __bit__(self, atom: bytes) -> int:
+        bit = self.bits.get(atom)
+        if bit is not None:
+            return bit
+
+        label = parse_term(atom.decode("utf-8")).arguments[0].string
+        bit = self.bits[atom] = 1 << self.mapping.ids[label]
+        return bit
+
+    def parse(self, line: bytes, horizon: int) -> MUS | None:
+        # [MUS #3] 53487: __mus__("a") __mus__("b")
+        if not line.startswith(self.PREFIX):
+            return None
+
+        header, _, atoms = line.partition(b":")
+        timestamp = int(header[header.index(b"] ") + 2 :])
+
+        bits = 0
+        for atom in atoms.split():
+            bits |= self.__bit__(atom)
+
+        return MUS(
+            horizon,
+            bits,
+            perf_counter() - Logger.start,
+            timestamp / 1000,
+        )
@@ -1,35 +1,55 @@
-import sys
-from time import perf_counter
-from typing import Optional
-from mus2muc.interfaces import MUSGenerator
-from mus2muc.constants import Constants
+import os
+import selectors
+import signal
+from multiprocessing import Pipe, Process, SimpleQueue
+from multiprocessing.connection import wait
 from pathlib import Path
-from subprocess import Popen, PIPE
-from clingo import parse_term
-from mus2muc.interfaces import MUS
-from mus2muc.utils import Logger
-from multiprocessing import Process, JoinableQueue
+from subprocess import PIPE, Popen
+from threading import Thread
+from time import monotonic, perf_counter
+
+from mus2muc.constants import Constants
+from mus2muc.exceptions import GroundingError
+from mus2muc.generators.grounder import Grounder
+from mus2muc.generators.wasp_output import WaspOutputParser
+from mus2muc.interfaces import MUS, ConjunctMapping, MUSGenerator
+from mus2muc.metrics import metrics
+
 
 class WaspRunner(Process):
-    def __init__(self, k: int, logic_program_file_path: Path, bin_folder: Path):
+    def __init__(
+        self,
+        k: int,
+        grounder: Grounder,
+        bin_folder: Path,
+        mapping: ConjunctMapping,
+        blocked: set[int] = frozenset(),
+        batch_size: int = 32,
+        batch_latency: float = 0.02,
+    ):
         super().__init__()
         self.k = k
-        self.filepath = logic_program_file_path
+        self.grounder = grounder
         self.bin_folder = bin_folder
+        self.blocked = frozenset(blocked)
+        self.batch_size = batch_size
+        self.batch_latency = batch_latency
 
-        self.queue = JoinableQueue()
+        # Batches of MUSes for the parent process, up to an empty batch, or
+        # the error that ended the runner. They are sent right away, so that
+        # nothing is left in flight when the process ends.
+        self.batches, self.sink = Pipe(duplex=False)
+        self.killed = False
+        # The outcome of the grounding, for the parent process: the time
+        # spent in gringo, None for a cached program, or a GroundingError.
+        self.grounding = SimpleQueue()
+        self.grounding_reported = False
         self.horizon = k
+        self.parser = WaspOutputParser(mapping)
 
     def run(self):
-        gringo_cmd = [
-            "gringo",
-            "-o",
-            "smodels",
-            "-c",
-            f"k={self.horizon}",
-            self.filepath.as_posix(),
-        ]
-
+        # The runner leads the process group of wasp and gringo, for `kill`.
+        os.setpgid(0, 0)
         wasp_cmd = [
             self.bin_folder / "wasp",
             f"--mus={Constants.MUS_PREDICATE_NAME}",
@@ -37,74 +57,240 @@ class WaspRunner(Process):
             "0",
         ]
 
-        gringo = Popen(gringo_cmd, stdout=PIPE, stderr=PIPE)
-        wasp = Popen(wasp_cmd, stdin=gringo.stdout, stderr=PIPE, stdout=PIPE)
+        wasp = None
+        try:
+            wasp = Popen(wasp_cmd, stdin=PIPE, stderr=PIPE, stdout=PIPE)
+            Thread(target=self.__feed__, args=(wasp,), daemon=True).start()
+            self.__stream_batches__(wasp)
+            self.sink.send(())
+
+        except Exception as e:
+            self.sink.send(e)
+
+        finally:
+            if wasp is not None:
+                wasp.terminate()
+
+    def start(self):
+        super().start()
+        # Only the runner writes batches.
+        self.sink.close()
+
+    def __feed__(self, wasp: Popen):
+        # The ground program is streamed from a separate thread, since wasp
+        # starts printing MUSes before it has read the whole program.
+        try:
+            self.grounding.put(self.grounder.stream(self.k, wasp.stdin))
+        except GroundingError as e:
+            self.grounding.put(e)
+        except (BrokenPipeError, ValueError):
+            pass
 
         try:
-            buffer = []
-            for row, line in enumerate(wasp.stdout):
-                line = line.strip().decode("ascii")
-                mus = self.__parse_mus__(line)
-                if mus is not None:
-                    buffer.append(mus)
+            wasp.stdin.close()
+        except (BrokenPipeError, ValueError):
+            pass
+
+    def kill(self):
+        # Called in the parent process. The group is killed after the runner,
+        # which cannot spawn wasp or gringo anymore: none of them is left
+        # orphaned, including when the runner had not set up its group yet.
+        if self.pid is None:
+            return
+
+        self.killed = True
+        super().kill()
+        try:
+            os.killpg(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def receive(self, block: bool = True) -> tuple[MUS, ...] | None:
+        # Called in the parent process: returns the next batch, or None if
+        # there is none yet and not `block`. A killed runner ends with an
+        # empty batch; the error of a failed one is raised.
+        ready = wait([self.batches, self.sentinel], timeout=None if block else 0)
+        if self.batches in ready:
+            try:
+                batch = self.batches.recv()
+            except EOFError:
+                batch = None
+            if isinstance(batch, Exception):
+                raise batch
+            if batch is not None:
+                return batch
+
+        elif self.sentinel not in ready:
+            return None
 
-                if len(buffer) > 5:
-                    self.queue.put(tuple(buffer))
-                    buffer.clear()
+        # The process ended without its last batch.
+        if self.killed:
+            return ()
+        self.join()
+        raise RuntimeError(
+            f"The wasp runner at k={self.k} exited with code {self.exitcode}"
+        )
+
+    def report_grounding(self):
+        # Called in the parent process: records the grounding of the horizon
+        # once the runner has sent it, and raises its error.
+        if self.grounding_reported or self.grounding.empty():
+            return
+
+        self.grounding_reported = True
+        outcome = self.grounding.get()
+        if isinstance(outcome, GroundingError):
+            raise outcome
+        self.grounder.record(self.k, outcome)
 
+    def __stream_batches__(self, wasp: Popen):
+        # A batch is sent to the parent process once it holds `batch_size`
+        # MUSes, or once its first MUS has waited for `batch_latency`
+        # seconds, whichever comes first. wasp's stdout is read from the raw
+        # file descriptor, so that waiting for a line can time out.
+        fd = wasp.stdout.fileno()
+        selector = selectors.DefaultSelector()
+        selector.register(fd, selectors.EVENT_READ)
+
+        buffer = []
+        batch_start = None
+        partial_line = b""
+
+        def flush():
+            nonlocal batch_start
             if len(buffer) > 0:
-                self.queue.put(tuple(buffer))
+                self.sink.send(tuple(buffer))
                 buffer.clear()
+            batch_start = None
 
-            self.queue.put(tuple())
+        def collect(line: bytes):
+            nonlocal batch_start
+            mus = self.__parse_mus__(line.strip())
+            if mus is None or self.__is_blocked__(mus):
+                return
 
-        except Exception as e:
-            wasp.terminate()
+            buffer.append(mus)
+            if batch_start is None:
+                batch_start = monotonic()
+            if len(buffer) >= self.batch_size:
+                flush()
 
-        finally:
-            wasp.terminate()
+        try:
+            while True:
+                timeout = (
+                    None
+                    if batch_start is None
+                    else max(0.0, batch_start + self.batch_latency - monotonic())
+                )
 
-    def __parse_mus__(self, wasp_line_output: str) -> Optional[MUS]:
-        # TODO: Parsing the time-stamp
-        if not wasp_line_output.startswith("[MUS #"):
-            return None
+                if selector.select(timeout):
+                    chunk = os.read(fd, 65536)
+                    if len(chunk) == 0:
+                        break
 
-        timestamp, atoms = wasp_line_output.split(': ')
-        mus_atoms = [parse_term(x) for x in atoms.split(" ")]
+                    *lines, partial_line = (partial_line + chunk).split(b"\n")
+                    for line in lines:
+                        collect(line)
 
-        timestamp = int(timestamp.split('] ')[1])
+                if (
+                    batch_start is not None
+                    and monotonic() - batch_start >= self.batch_latency
+                ):
+                    flush()
 
-        rbracket_idx = wasp_line_output.find("]")
-        # [MUS #3] 53487: a b c x y z
-        return MUS(
-            self.horizon,
-            tuple(x.arguments[0].string for x in mus_atoms),
-            perf_counter() - Logger.start,
-            timestamp / 1000
-        )
+            if len(partial_line) > 0:
+                collect(partial_line)
+            flush()
+
+        finally:
+            selector.close()
+
+    def __is_blocked__(self, mus: MUS) -> bool:
+        # wasp cannot be told to skip a MUS: a constraint over its __mus__
+        # atoms would relax every superset, including the whole set of
+        # conjuncts, and leave no MUS to enumerate. Known MUCs are dropped
+        # here instead, before they are pickled to the parent process.
+        return mus.conjuncts in self.blocked
+
+    def __parse_mus__(self, wasp_line_output: bytes) -> MUS | None:
+        return self.parser.parse(wasp_line_output, self.horizon)
 
 
 class WASPGeneratorThread(MUSGenerator):
-    def __init__(self, k: int, logic_program_file_path: Path, bin_folder):
+    def __init__(
+        self,
+        k: int,
+        grounder: Grounder,
+        mapping: ConjunctMapping,
+        bin_folder,
+        batch_size: int = 32,
+        batch_latency: float = 0.02,
+    ):
         super().__init__(k)
-        self.filepath = logic_program_file_path
+        self.grounder = grounder
+        self.mapping = mapping
         self.bin_folder = bin_folder
         self.k = k
-        self.runner = WaspRunner(k, logic_program_file_path, bin_folder)
+        self.batch_size = batch_size
+        self.batch_latency = batch_latency
+        self.runner = self.__make_runner__()
+        self.exhausted = False
+        self.started_at: float | None = None
+
+    def __make_runner__(self) -> WaspRunner:
+        return WaspRunner(
+            self.k,
+            self.grounder,
+            self.bin_folder,
+            self.mapping,
+            self.blocked,
+            self.batch_size,
+            self.batch_latency,
+        )
 
     def set_horizon_and_restart(self, k):
         self.kill()
         self.k = k
-        self.runner = WaspRunner(self.k, self.filepath, self.bin_folder)
+        self.horizon = k
+        self.runner = self.__make_runner__()
+        self.exhausted = False
         self.start()
 
     def start(self):
+        self.started_at = perf_counter()
         self.runner.start()
 
     def kill(self):
         self.runner.kill()
 
+    def __received__(self, mus_buffer):
+        self.runner.report_grounding()
+        # Time from the start of wasp to its first MUS, at this horizon.
+        if self.started_at is not None and len(mus_buffer) > 0:
+            metrics.add_time(
+                "wasp_first_mus", perf_counter() - self.started_at, k=self.k
+            )
+            self.started_at = None
+
     def get_muses(self):
-        mus_buffer = self.runner.queue.get()
-        self.runner.queue.task_done()
+        if self.exhausted:
+            return ()
+
+        with metrics.timed("generator_queue_wait"):
+            mus_buffer = self.runner.receive()
+        self.exhausted = len(mus_buffer) == 0
+        self.__received__(mus_buffer)
         return mus_buffer
+
+    def poll_muses(self):
+        muses = []
+        while not self.exhausted:
+            mus_buffer = self.runner.receive(block=False)
+            if mus_buffer is None:
+                break
+
+            self.exhausted = len(mus_buffer) == 0
+            self.__received__(mus_buffer)
+            muses.extend(mus_buffer)
+
+        return tuple(muses)
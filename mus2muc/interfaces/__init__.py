@@ -1,5 +1,13 @@
-from .model import MUS, CertifierOutput, MUCStatus, ConjunctMapping
-from .certifier import Certifier
+from .model import MUS, CertifierOutput, MUCStatus, ConjunctMapping, FormulaBuilder
+from .certifier import Certifier, ExternalCertifier
 from .generator import MUSGenerator
-from .cli import CertifierType, Options
+from .async_generator import AsyncMUSGenerator
+from .cli import (
+    CertifierType,
+    GeneratorType,
+    FlushPolicy,
+    OutputFormat,
+    SerializerType,
+    Options,
+)
 from .writer import MUCWriter
@@ -0,0 +1,35 @@
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+
+from mus2muc.interfaces import MUS
+
+
+class AsyncMUSGenerator(ABC):
+    def __init__(self, start_horizon: int) -> None:
+        self.horizon: int = start_horizon
+        self.blocked: set[int] = set()
+
+    @abstractmethod
+    async def set_horizon_and_restart(self, h: int) -> None:
+        self.horizon = h
+
+    @abstractmethod
+    async def get_muses(self) -> Sequence[MUS]:
+        # Returns an empty sequence once the generator is exhausted.
+        pass
+
+    def block(self, mus: MUS) -> None:
+        self.blocked.add(mus.conjuncts)
+
+    @abstractmethod
+    async def start(self):
+        pass
+
+    @abstractmethod
+    def kill(self):
+        # Stops the generator right away, without waiting for it.
+        pass
+
+    async def stop(self):
+        # Kills the generator and waits for it to be gone.
+        self.kill()
@@ -1,35 +1,223 @@
 from abc import ABC, abstractmethod
+from functools import partial
+from threading import Lock, get_ident
 from time import perf_counter
-from typing import Tuple, Optional
-from mus2muc.interfaces import ConjunctMapping, MUCStatus, MUS, CertifierOutput
+
+from mus2muc.interfaces import MUS, CertifierOutput, ConjunctMapping, MUCStatus
+from mus2muc.metrics import metrics
+from mus2muc.processes import SolverProcess, WarmProcessPool
 from mus2muc.utils import Logger
 
 
 class Certifier(ABC):
     def __init__(self, mapping: ConjunctMapping):
         self.mapping = mapping
+        self.cache = None
+        # Threads whose certifications can be cancelled one by one, and the
+        # ones that were.
+        self.tracked: set[int] = set()
+        self.cancelled: set[int] = set()
+        self.tracked_lock = Lock()
+
+    @abstractmethod
+    def certify(self, mus: MUS) -> CertifierOutput:
+        pass
+
+    @abstractmethod
+    def use_warm_processes(self, size: int):
+        pass
+
+    def __track__(self, thread: int):
+        # `cancel(thread)` reaches the certifications of `thread` until
+        # `__untrack__`, including the ones it has not started yet.
+        with self.tracked_lock:
+            self.tracked.add(thread)
+
+    def __untrack__(self, thread: int):
+        with self.tracked_lock:
+            self.tracked.discard(thread)
+            self.cancelled.discard(thread)
+
+    def __cancelled__(self) -> bool:
+        # Whether the certification of the calling thread was cancelled.
+        with self.tracked_lock:
+            return get_ident() in self.cancelled
+
+    def use_cache(self, cache):
+        # `cache` is a CertificationCache, consulted before certifying.
+        self.cache = cache
+
+    def __cached__(self, mus: MUS) -> CertifierOutput | None:
+        if self.cache is None:
+            return None
+
+        start = perf_counter()
+        entry = self.cache.get(mus.conjuncts)
+        if entry is None:
+            metrics.count("certification_cache_misses")
+            return None
+
+        metrics.count("certification_cache_hits")
+        status, model_length = entry
+        return CertifierOutput(
+            perf_counter() - Logger.start, perf_counter() - start, model_length, status
+        )
+
+    def __store__(self, mus: MUS, output: CertifierOutput):
+        if self.cache is not None:
+            self.cache.put(mus.conjuncts, output.result, output.witness_model_length)
+
+    def __delegate__(self, certifier: "Certifier", mus: MUS) -> CertifierOutput | None:
+        # Certifies `mus` with another certifier, which tracks the calling
+        # thread too, so that cancelling this certification reaches its
+        # solvers. None if the certification was cancelled before.
+        thread = get_ident()
+        certifier.__track__(thread)
+        try:
+            if self.__cancelled__():
+                return None
+            return certifier.certify(mus)
+        finally:
+            certifier.__untrack__(thread)
+
+    def cancel(self, thread: int | None = None):
+        # Stops the certifications of a tracked `thread`, or all the running
+        # ones. Subclasses stop their solvers after this call, and check
+        # `__cancelled__` before starting new ones.
+        with self.tracked_lock:
+            if thread is None:
+                self.cancelled |= self.tracked
+            elif thread in self.tracked:
+                self.cancelled.add(thread)
+
+    def close(self):
+        self.cancel()
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
+
+class ExternalCertifier(Certifier):
+    # A certifier that runs a solver executable on the formula of each MUS.
+    ISOLATED_WORKDIR = False
+
+    def __init__(self, mapping: ConjunctMapping):
+        super().__init__(mapping)
+        self.processes: dict[int, SolverProcess] = {}
+        self.processes_lock = Lock()
+        self.warm_pool: WarmProcessPool | None = None
+
+    @abstractmethod
+    def __command__(self) -> list[str]:
+        pass
 
     @abstractmethod
-    def __call_solver__(self, formula_string: str) -> Tuple[str, str]:
+    def __call_solver__(self, formula: bytes) -> tuple[str, str, float]:
+        # Returns the output of the solver, and the time it took to answer
+        # once spawned.
         pass
 
     @abstractmethod
     def __decode_solver_output__(
         self, stdout: str, stderr: str
-    ) -> Tuple[MUCStatus, Optional[int]]:
+    ) -> tuple[MUCStatus, int | None]:
         pass
 
-    def __build_formula__(self, mus: MUS):
-        return self.mapping.formula_given_indices(mus.objective_atoms)
+    def __build_formula__(self, mus: MUS) -> bytes:
+        return self.mapping.builder.build(mus.conjuncts)
+
+    def use_warm_processes(self, size: int):
+        factory = partial(SolverProcess, self.__command__(), self.ISOLATED_WORKDIR)
+        self.warm_pool = WarmProcessPool(factory, size)
+
+    def __spawn__(self, warm: bool = True) -> SolverProcess:
+        # Processes are tracked per calling thread, so that `cancel` can
+        # reach solver calls running in a certifier pool.
+        with metrics.timed("certifier_spawn"):
+            if warm and self.warm_pool is not None:
+                process = self.warm_pool.acquire()
+            else:
+                process = SolverProcess(self.__command__(), self.ISOLATED_WORKDIR)
+
+        with self.processes_lock:
+            self.processes[get_ident()] = process
+        if self.__cancelled__():
+            # Cancelled while spawning: `cancel` may have missed the process.
+            process.kill()
+        return process
+
+    def __release__(self, process: SolverProcess) -> bool:
+        # Returns False if the process was killed by `cancel`.
+        with self.processes_lock:
+            owned = self.processes.get(get_ident()) is process
+            if owned:
+                del self.processes[get_ident()]
+        process.close()
+        return owned
+
+    def __run_solver__(self, payload: bytes) -> tuple[str, str, float]:
+        process = self.__spawn__()
+        start = perf_counter()
+        try:
+            with metrics.timed("certifier_solve"):
+                stdout, stderr = process.communicate(payload)
+        finally:
+            owned = self.__release__(process)
+        elapsed = perf_counter() - start
+
+        if (
+            self.warm_pool is not None
+            and owned
+            and process.crashed()
+            and len(stdout) == 0
+        ):
+            # A warm process that crashed before answering is retried once
+            # on a freshly spawned one.
+            process = self.__spawn__(warm=False)
+            start = perf_counter()
+            try:
+                with metrics.timed("certifier_solve"):
+                    stdout, stderr = process.communicate(payload)
+            finally:
+                self.__release__(process)
+            elapsed += perf_counter() - start
+
+        return stdout.decode("ascii"), stderr.decode("ascii"), elapsed
+
+    def cancel(self, thread: int | None = None):
+        super().cancel(thread)
+        with self.processes_lock:
+            if thread is None:
+                running = list(self.processes.values())
+                self.processes.clear()
+            else:
+                running = [
+                    p for p in [self.processes.pop(thread, None)] if p is not None
+                ]
+
+        for process in running:
+            process.kill()
+
+    def close(self):
+        super().close()
+        if self.warm_pool is not None:
+            self.warm_pool.close()
+            self.warm_pool = None
 
     def certify(self, mus: MUS) -> CertifierOutput:
+        cached = self.__cached__(mus)
+        if cached is not None:
+            return cached
+
         formula = self.__build_formula__(mus)
-        start = perf_counter()
-        stdout, stderr = self.__call_solver__(formula)
-        end = perf_counter()
+        stdout, stderr, elapsed = self.__call_solver__(formula)
         status, model_length = self.__decode_solver_output__(stdout, stderr)
 
         if status == MUCStatus.SATISFIABLE:
             assert model_length is not None
 
-        return CertifierOutput(perf_counter() - Logger.start, end - start, model_length, status)
+        output = CertifierOutput(
+            perf_counter() - Logger.start, elapsed, model_length, status
+        )
+        self.__store__(mus, output)
+        return output
@@ -1,12 +1,42 @@
 from dataclasses import dataclass
 from enum import StrEnum
 from pathlib import Path
-from typing import Optional
 
 
 class CertifierType(StrEnum):
     BLACK = "black"
     AALTAF = "aaltaf"
+    CLINGO = "clingo"
+    PORTFOLIO = "portfolio"
+
+
+class GeneratorType(StrEnum):
+    WASP = "wasp"
+    INCREMENTAL = "incremental"
+
+
+class SerializerType(StrEnum):
+    JSON = "json"
+    ORJSON = "orjson"
+
+
+class OutputFormat(StrEnum):
+    JSON = "json"
+    BINARY = "binary"
+
+
+class FlushPolicy(StrEnum):
+    # Events that reach the output if the process crashes (SIGKILL,
+    # segfault); flushed events are not fsynced, so an operating system
+    # crash may lose more:
+    #  - EVENT: every event written before the crash.
+    #  - COUNT: all but the last `flush_every - 1` events at most.
+    #  - INTERVAL: all but the events of the last `flush_interval` seconds.
+    # With every policy, a normal exit, an exception, SIGINT and SIGTERM
+    # flush all the events before the output is closed.
+    EVENT = "event"
+    COUNT = "count"
+    INTERVAL = "interval"
 
 
 @dataclass(frozen=True)
@@ -17,10 +47,38 @@ class Options:
     k_start: int
     certifier_type: CertifierType
     output_file: Path
-    total_timeout: Optional[int]
-    total_mucs: Optional[int]
+    total_timeout: int | None
+    total_mucs: int | None
     bin_folder: Path
     verbose: bool
+    certifier_workers: int = 1
+    warm_certifiers: int = 0
+    generator_type: GeneratorType = GeneratorType.WASP
+    ensemble_width: int = 1
+    ensemble_factor: int = 2
+    batch_size: int = 32
+    batch_latency: float = 20
+    in_memory_probe: bool = False
+    ground_cache: bool = False
+    ground_cache_size: int = 1024
+    certification_cache: bool = False
+    output_format: OutputFormat = OutputFormat.JSON
+    serializer: SerializerType = SerializerType.JSON
+    include_formula: bool = True
+    flush_policy: FlushPolicy = FlushPolicy.EVENT
+    flush_every: int = 100
+    flush_interval: float = 1.0
+    async_engine: bool = False
+    certifier_timeout: float | None = None
+    metrics: bool = False
+    metrics_file: Path | None = None
+    metrics_interval: float = 10.0
+    tiered: bool = False
+    cheap_horizon: int = 4
+    clingo_bound: int = 16
+    fallback_certifier: CertifierType | None = CertifierType.AALTAF
+    portfolio: tuple[CertifierType, ...] = (CertifierType.AALTAF, CertifierType.BLACK)
+    portfolio_width: int | None = None
 
     def __post_init__(self):
         if self.total_mucs is not None and self.total_mucs <= 0:
@@ -36,3 +94,69 @@ class Options:
 
         if self.k_start <= 0:
             raise ValueError("Starting value for k must be greater than zero")
+
+        if self.certifier_workers <= 0:
+            raise ValueError("Number of certifier workers must be a positive integer.")
+
+        if self.warm_certifiers < 0:
+            raise ValueError("Number of warm certifier processes cannot be negative.")
+
+        if self.ensemble_width <= 0:
+            raise ValueError("Ensemble width must be a positive integer.")
+
+        if self.ensemble_factor <= 1:
+            raise ValueError("Ensemble horizon factor must be greater than one.")
+
+        if self.batch_size <= 0:
+            raise ValueError("MUS batch size must be a positive integer.")
+
+        if self.batch_latency < 0:
+            raise ValueError("MUS batch latency cannot be negative (milliseconds).")
+
+        if self.ground_cache_size <= 0:
+            raise ValueError(
+                "Ground program cache size must be a positive integer (MB)."
+            )
+
+        if self.output_format == OutputFormat.BINARY and self.output_file is None:
+            raise ValueError("The binary output format requires an output file (-o).")
+
+        if self.flush_every <= 0:
+            raise ValueError(
+                "Number of events between flushes must be a positive integer."
+            )
+
+        if self.flush_interval <= 0:
+            raise ValueError("Flush interval must be a positive number (seconds).")
+
+        if self.certifier_timeout is not None and self.certifier_timeout <= 0:
+            raise ValueError("Certifier timeout must be a positive number (seconds).")
+
+        if self.metrics_interval <= 0:
+            raise ValueError("Metrics interval must be a positive number (seconds).")
+
+        if self.cheap_horizon <= 0:
+            raise ValueError("Horizon of the cheap checks must be a positive integer.")
+
+        if self.clingo_bound <= 0:
+            raise ValueError(
+                "Bound of the clingo certifier must be a positive integer."
+            )
+
+        if self.fallback_certifier not in (
+            None,
+            CertifierType.AALTAF,
+            CertifierType.BLACK,
+        ):
+            raise ValueError("The fallback certifier must be an external certifier.")
+
+        if len(self.portfolio) == 0 or len(set(self.portfolio)) < len(self.portfolio):
+            raise ValueError("The portfolio must list distinct certifiers.")
+
+        if any(
+            x not in (CertifierType.AALTAF, CertifierType.BLACK) for x in self.portfolio
+        ):
+            raise ValueError("The portfolio must list external certifiers.")
+
+        if self.portfolio_width is not None and self.portfolio_width <= 0:
+            raise ValueError("Portfolio width must be a positive integer.")
@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Generator, Sequence
+from collections.abc import Sequence
+
 from mus2muc.interfaces import MUS
 
 
 class MUSGenerator(ABC):
     def __init__(self, start_horizon: int) -> None:
         self.horizon: int = start_horizon
+        self.blocked: set[int] = set()
 
     @abstractmethod
     def set_horizon_and_restart(self, h: int) -> None:
@@ -15,6 +17,15 @@ class MUSGenerator(ABC):
     def get_muses(self) -> Sequence[MUS]:
         pass
 
+    def block(self, mus: MUS) -> None:
+        # Certified MUCs are not reported again after a restart.
+        self.blocked.add(mus.conjuncts)
+
+    def poll_muses(self) -> Sequence[MUS]:
+        # Non-blocking variant of get_muses: returns the MUSes that are
+        # already available, or an empty sequence.
+        return ()
+
     def start(self):
         pass
 
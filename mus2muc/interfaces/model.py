@@ -1,47 +1,110 @@
-from dataclasses import dataclass
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from enum import IntEnum, auto
-from pathlib import Path
-from typing import Tuple, Optional, Dict
+from threading import Lock
+
+
+class FormulaBuilder:
+    # Builds the conjunction of a set of conjuncts as the bytes that are fed
+    # to the certifiers. Fragments are encoded once, and the most recently
+    # built conjunctions are kept: the same set is built by the certifier
+    # and by the writers, and candidates come back after a restart.
+    SIZE = 1024
+
+    def __init__(self, fragments: Iterable[str], size: int = SIZE):
+        self.fragments = tuple(f.encode("utf-8") for f in fragments)
+        self.size = size
+        self.built: OrderedDict[int, bytes] = OrderedDict()
+        self.lock = Lock()
+
+    def build(self, bits: int) -> bytes:
+        with self.lock:
+            formula = self.built.get(bits)
+            if formula is not None:
+                self.built.move_to_end(bits)
+                return formula
+
+        formula = b" & ".join([self.fragments[i] for i in iterate_bits(bits)])
+        with self.lock:
+            self.built[bits] = formula
+            if len(self.built) > self.size:
+                self.built.popitem(last=False)
+        return formula
 
 
 @dataclass(frozen=True)
 class ConjunctMapping:
-    mapping: Dict[str, str]
+    mapping: dict[str, str]
+    labels: tuple[str, ...] = field(init=False, repr=False, compare=False)
+    ids: dict[str, int] = field(init=False, repr=False, compare=False)
+    fragments: tuple[str, ...] = field(init=False, repr=False, compare=False)
+    builder: FormulaBuilder = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Conjuncts are interned as dense integers, in file order, and their
+        # parenthesized formulas are built once. Sets of conjuncts are int
+        # bitsets over these ids; labels are only needed for the output.
+        object.__setattr__(self, "labels", tuple(self.mapping))
+        object.__setattr__(self, "ids", {fid: i for i, fid in enumerate(self.labels)})
+        object.__setattr__(
+            self, "fragments", tuple("(" + f + ")" for f in self.mapping.values())
+        )
+        object.__setattr__(self, "builder", FormulaBuilder(self.fragments))
+
+    def __len__(self):
+        return len(self.mapping)
 
     @staticmethod
     def from_formula_string(formula_string):
-        formula_dict = dict()
+        formula_dict = {}
         for line in formula_string.splitlines():
             line = line.strip()
             fid, f = line.split(":=")
             formula_dict[fid.strip()] = f.strip()[:-1]
         return ConjunctMapping(formula_dict)
 
-    def formula_given_indices(self, indices: Tuple[str, ...]) -> str:
-        return " & ".join("(" + self.mapping[i] + ")" for i in indices)
+    def formula_given_bits(self, bits: int) -> str:
+        return self.builder.build(bits).decode("utf-8")
+
+    def labels_of(self, bits: int) -> tuple[str, ...]:
+        return tuple(self.labels[i] for i in iterate_bits(bits))
+
+    def bitset(self, indices: Iterable[str]) -> int:
+        bits = 0
+        for i in indices:
+            bits |= 1 << self.ids[i]
+        return bits
+
+
+def iterate_bits(bits: int) -> Iterator[int]:
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
 
 
 @dataclass(frozen=True)
 class MUS:
     k: int
-    objective_atoms: Tuple[str, ...]
+    conjuncts: int  # Bitset over the conjunct ids of the ConjunctMapping.
     timestamp: float
     mus_compute_time: float
 
     @property
     def size(self):
-        return len(self.objective_atoms)
+        return self.conjuncts.bit_count()
 
     @property
     def empty(self):
-        return len(self.objective_atoms) == 0
+        return self.conjuncts == 0
 
 
 @dataclass(frozen=True)
 class CertifierOutput:
     timestamp: float
     core_computation_time: float
-    witness_model_length: Optional[int]
+    witness_model_length: int | None
     result: "MUCStatus"
 
     @property
@@ -1,26 +1,102 @@
 import sys
+from threading import Event, Lock, Thread
 
 from mus2muc.interfaces import MUS, CertifierOutput
+from mus2muc.interfaces.cli import FlushPolicy
+from mus2muc.metrics import metrics
 from mus2muc.utils import Logger
 
 
 class MUCWriter:
-    def __init__(self, output_file, mapping):
+    def __init__(
+        self,
+        output_file,
+        mapping,
+        flush_policy: FlushPolicy = FlushPolicy.EVENT,
+        flush_every: int = 100,
+        flush_interval: float = 1.0,
+        serializer=None,
+        include_formula: bool = True,
+    ):
         super().__init__()
         self.output_file = output_file
         self.mapping = mapping
         self.counter = Logger.start
         self.id = 0
 
-    def __write__(self, something):
+        # `serializer` turns an event into a line, see mus2muc.writers; the
+        # formula of a MUS is only built if it is part of the output.
+        self.serializer = serializer
+        self.include_formula = include_formula
+
+        # The output file is opened at the first event, and kept open until
+        # `close`; writes go through its buffer, and are flushed according to
+        # the policy.
+        self.flush_policy = flush_policy
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.handle = None
+        self.unflushed = 0
+        self.lock = Lock()
+        self.closed = Event()
+        self.flusher = None
+        if flush_policy == FlushPolicy.INTERVAL:
+            self.flusher = Thread(target=self.__flush_periodically__, daemon=True)
+            self.flusher.start()
+
+    def __open__(self):
         if self.output_file is None:
-            sys.stdout.write(something + "\n")
-            sys.stdout.flush()
+            return sys.stdout
+        return open(self.output_file, "a", buffering=2**16)
+
+    def __flush__(self):
+        if self.handle is not None and self.unflushed > 0:
+            self.handle.flush()
+            self.unflushed = 0
+
+    def __flush_periodically__(self):
+        while not self.closed.wait(self.flush_interval):
+            with self.lock:
+                self.__flush__()
+
+    def __write__(self, something):
+        self.__write_record__(something + "\n")
+
+    def __write_record__(self, record):
+        # `record` is str or bytes, depending on the mode of the handle
+        # returned by `__open__`.
+        with self.lock, metrics.timed("writer"):
+            if self.handle is None:
+                self.handle = self.__open__()
+
+            self.handle.write(record)
+            self.unflushed += 1
 
-        else:
-            with open(self.output_file, "a") as f:
-                f.write(something + "\n")
-                f.flush()
+            if self.flush_policy == FlushPolicy.EVENT or (
+                self.flush_policy == FlushPolicy.COUNT
+                and self.unflushed >= self.flush_every
+            ):
+                self.__flush__()
+
+    def __emit__(self, output):
+        with metrics.timed("writer_serialize"):
+            line = self.serializer.dumps(output)
+        self.__write__(line)
+
+    def __labels__(self, mus: MUS):
+        return self.mapping.labels_of(mus.conjuncts)
+
+    def __add_formula__(self, output, mus: MUS):
+        if self.include_formula:
+            output["formula"] = self.mapping.formula_given_bits(mus.conjuncts)
+
+    def close(self):
+        self.closed.set()
+        with self.lock:
+            self.__flush__()
+            if self.handle is not None and self.handle is not sys.stdout:
+                self.handle.close()
+            self.handle = None
 
     def found_a_mus(self, mus: MUS):
         pass
@@ -31,6 +107,9 @@ class MUCWriter:
     def mus_is_a_false_positive(self, mus: MUS, cert_out: CertifierOutput):
         pass
 
+    def mus_is_unknown(self, mus: MUS, cert_out: CertifierOutput):
+        pass
+
     def mus_is_skipped(self, mus: MUS):
         pass
 
@@ -39,3 +118,7 @@ class MUCWriter:
 
     def generator_restart(self, k: int):
         pass
+
+    def run_metrics(self, summary):
+        # `summary` is Metrics.summary(), at the end of the run.
+        pass
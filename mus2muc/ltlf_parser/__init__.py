@@ -1,3 +1,4 @@
 from .parser import parse_formulae_and_annotate
+from .parser import annotate_formulae
 from .parser import parse_formula_as_object
-from .parsing_utils import compose_logic_program
+from .parsing_utils import compose_logic_program, compose_probe_program
@@ -1,15 +1,18 @@
-from typing import TypeVar, Set, Type, Sequence
+from collections.abc import Sequence
+from functools import cache
+from hashlib import sha256
+from pathlib import Path
+from typing import TypeVar
 
-import clingo  # type: ignore
 import lark  # type: ignore
 from lark import Lark, Transformer
-from pathlib import Path
+
+from mus2muc.exceptions import ParsingError, UnsupportedOperator
 from mus2muc.ltlf_parser.parser_constants import Constants as ParserConstants
 from mus2muc.ltlf_parser.reify_as_atoms import ReifyFormulaAsFacts
 from mus2muc.ltlf_parser.reify_as_object import ReifyFormulaAsObject
-from mus2muc.exceptions import ParsingError, UnsupportedOperator
 from mus2muc.ltlf_parser.reify_interface import Reify
-from mus2muc.constants import Constants
+from mus2muc.utils import cache_directory
 
 T = TypeVar("T")
 G = TypeVar("G")
@@ -35,7 +38,8 @@ class LTLfFlatTransformer(Transformer[T]):
 
         return "\n".join(
             chain(
-                [str(fact) + "." for fact in self.reify.result()], self.annotation_rules
+                [str(fact) + "." for fact in sorted(self.reify.result())],
+                self.annotation_rules,
             )
         )
 
@@ -399,29 +403,63 @@ class LTLfObjectTransformer(Transformer[T]):
         return self.reify.last()
 
 
+GRAMMAR_PATH = Path(__file__).parent / "grammar.lark"
+OBJECT_GRAMMAR_PATH = Path(__file__).parent / "object_grammar.lark"
+
+
+def parser_cache_file(grammar_path: Path, grammar: str) -> str | bool:
+    # The LALR tables are stored next to the other mus2muc caches, in a file
+    # named after the hash of the grammar. Lark checks the hash stored in the
+    # file as well, and rebuilds a stale cache. Without a writable cache
+    # directory, the tables are built in memory.
+    digest = sha256(grammar.encode("utf-8")).hexdigest()[:16]
+    folder = cache_directory() / "lark"
+    try:
+        folder.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return False
+
+    return (folder / f"{grammar_path.stem}-{digest}.cache").as_posix()
+
+
+@cache
+def get_parser(grammar_path: Path) -> Lark:
+    # Parsers are built once per process, and loaded from the on-disk cache
+    # when the grammar has not changed.
+    grammar = grammar_path.read_text()
+    return Lark(
+        grammar,
+        parser="lalr",
+        start="start",
+        cache=parser_cache_file(grammar_path, grammar),
+    )
+
+
 def parse_formula_as_object(formula_string: str):
-    GRAMMAR = Path(__file__).parent / "object_grammar.lark"
-    parser = Lark(GRAMMAR.read_text(), parser="lalr", start="start")
+    parser = get_parser(OBJECT_GRAMMAR_PATH)
     transformer = LTLfObjectTransformer()
     tree = parser.parse(formula_string)
     return transformer.transform(tree)  # type: ignore
 
 
 def parse_formula_as_facts(formula_string: str, start_from: int) -> G:
-    GRAMMAR = Path(__file__).parent / "grammar.lark"
-    parser = Lark(GRAMMAR.read_text(), parser="lalr", start="start")
+    parser = get_parser(GRAMMAR_PATH)
     transformer = LTLfFlatTransformer(start_from)
     tree = parser.parse(formula_string)
     return transformer.transform(tree)  # type: ignore
 
 
-def parse_formulae_and_annotate(formula_string: str, target_path: Path, mode: str):
-    GRAMMAR = Path(__file__).parent / "grammar.lark"
-    parser = Lark(GRAMMAR.read_text(), parser="lalr", start="start")
+def annotate_formulae(formula_string: str) -> str:
+    parser = get_parser(GRAMMAR_PATH)
     transformer = LTLfFlatTransformer(1)
     tree = parser.parse(formula_string)
     transformer.transform(tree)
+    return transformer.get_program()
+
+
+def parse_formulae_and_annotate(formula_string: str, target_path: Path, mode: str):
+    program = annotate_formulae(formula_string)
 
     with target_path.open(mode) as f:
-        f.write(transformer.get_program())
-        f.flush()
\ No newline at end of file
+        f.write(program)
+        f.flush()
@@ -1,11 +1,17 @@
 from pathlib import Path
-from mus2muc.ltlf_parser import parse_formulae_and_annotate
-from typing import Sequence
+
+from mus2muc.ltlf_parser import annotate_formulae
+from mus2muc.metrics import metrics
+
+
+def compose_probe_program(formula_string: str, encoding: Path) -> str:
+    with metrics.timed("parse"):
+        return encoding.read_text() + "\n" + annotate_formulae(formula_string)
 
 
 def compose_logic_program(formula_string: str, encoding: Path, target_file: Path):
-    with target_file.open("w") as f:
-        f.write(encoding.open("r").read() + "\n")
+    program = compose_probe_program(formula_string, encoding)
+    with metrics.timed("probe_write"), target_file.open("w") as f:
+        f.write(program)
 
-    parse_formulae_and_annotate(formula_string, target_file, "a")
     return target_file
@@ -0,0 +1,157 @@
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Event, Lock, Thread
+from time import perf_counter
+from typing import Any
+
+from mus2muc.utils import log
+
+MetricKey = tuple[str, tuple[tuple[str, str], ...]]
+
+
+class Metrics:
+    # Process-wide registry of the time spent in each phase of a run, and of
+    # event counters. A timer keeps its count, total and maximum; labels
+    # split a metric, e.g. the grounding time by horizon. Recording is a
+    # dictionary update under a lock, cheap next to the solver calls that
+    # are timed.
+    PREFIX = "mus2muc_"
+
+    def __init__(self):
+        self.lock = Lock()
+        self.timers: dict[MetricKey, list] = {}
+        self.counters: dict[MetricKey, int] = {}
+
+    @staticmethod
+    def __key__(name: str, labels: dict[str, Any]) -> MetricKey:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def reset(self):
+        with self.lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    def add_time(self, name: str, seconds: float, **labels):
+        key = self.__key__(name, labels)
+        with self.lock:
+            timer = self.timers.get(key)
+            if timer is None:
+                self.timers[key] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                timer[2] = max(timer[2], seconds)
+
+    def count(self, name: str, n: int = 1, **labels):
+        key = self.__key__(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    @contextmanager
+    def timed(self, name: str, **labels):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, perf_counter() - start, **labels)
+
+    @staticmethod
+    def __label__(key: MetricKey) -> str:
+        name, labels = key
+        if len(labels) == 0:
+            return name
+        return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+    def summary(self) -> dict[str, Any]:
+        with self.lock:
+            timers = {
+                self.__label__(key): {"count": count, "total": total, "max": longest}
+                for key, (count, total, longest) in sorted(self.timers.items())
+            }
+            counters = {
+                self.__label__(key): value
+                for key, value in sorted(self.counters.items())
+            }
+
+        # Hit rates of the caches, from their `<cache>_hits`/`<cache>_misses`
+        # counters.
+        rates = {}
+        for name in counters:
+            cache, _, outcome = name.rpartition("_")
+            if outcome in ("hits", "misses"):
+                hits = counters.get(cache + "_hits", 0)
+                lookups = hits + counters.get(cache + "_misses", 0)
+                rates[cache + "_hit_rate"] = hits / lookups
+
+        return {"timers": timers, "counters": counters, "rates": rates}
+
+    @classmethod
+    def __prometheus_labels__(cls, labels) -> str:
+        if len(labels) == 0:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+    def prometheus(self) -> str:
+        # Timers are exported as summaries in seconds, without quantiles.
+        with self.lock:
+            timers = sorted(self.timers.items())
+            counters = sorted(self.counters.items())
+
+        lines = []
+        declared = set()
+        for (name, labels), (count, total, _) in timers:
+            metric = f"{self.PREFIX}{name}_seconds"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} summary")
+            lines.append(f"{metric}_sum{self.__prometheus_labels__(labels)} {total}")
+            lines.append(f"{metric}_count{self.__prometheus_labels__(labels)} {count}")
+
+        for (name, labels), value in counters:
+            metric = f"{self.PREFIX}{name}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{self.__prometheus_labels__(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: Path):
+        # Replaced atomically, for the node exporter's textfile collector.
+        temporary = path.with_name(f".{path.name}.{os.getpid()}")
+        temporary.write_text(self.prometheus())
+        temporary.replace(path)
+
+
+metrics = Metrics()
+
+
+class MetricsDumper:
+    # Writes the Prometheus text of `metrics` to a file every `interval`
+    # seconds, and a last time when stopped.
+    def __init__(self, path: Path, interval: float):
+        self.path = path
+        self.interval = interval
+        self.stopped = Event()
+        self.thread: Thread | None = None
+
+    def __run__(self):
+        while not self.stopped.wait(self.interval):
+            self.__dump__()
+
+    def __dump__(self):
+        try:
+            metrics.dump(self.path)
+        except OSError as e:
+            log(f"Cannot write the metrics to {self.path}: {e}")
+
+    def start(self):
+        self.thread = Thread(target=self.__run__, daemon=True, name="metrics")
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.__dump__()
@@ -0,0 +1,86 @@
+import tempfile
+from collections.abc import Callable
+from queue import Empty, Queue
+from subprocess import PIPE, Popen
+from threading import Thread
+
+
+class SolverProcess:
+    def __init__(self, cmd: list[str], isolated: bool):
+        # Isolated processes run in a private working directory, for solvers
+        # that leave files behind in their cwd.
+        self.workdir = tempfile.TemporaryDirectory() if isolated else None
+        self.process = Popen(
+            cmd,
+            stdin=PIPE,
+            stdout=PIPE,
+            stderr=PIPE,
+            cwd=None if self.workdir is None else self.workdir.name,
+        )
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def crashed(self) -> bool:
+        return self.process.returncode is not None and self.process.returncode < 0
+
+    def communicate(self, payload: bytes) -> tuple[bytes, bytes]:
+        return self.process.communicate(payload)
+
+    def kill(self):
+        self.process.kill()
+
+    def close(self):
+        self.process.kill()
+        self.process.wait()
+        if self.workdir is not None:
+            self.workdir.cleanup()
+
+
+class WarmProcessPool:
+    # Keeps `size` solver processes spawned and blocked on their stdin, so
+    # that a certifier call does not pay for process creation. The solvers
+    # answer a single query per process: every acquired process is replaced
+    # by a fresh one in the background, and processes that died while idle
+    # are discarded and replaced as well.
+    def __init__(self, factory: Callable[[], SolverProcess], size: int):
+        self.factory = factory
+        self.size = size
+        self.closed = False
+        self.idle: Queue[SolverProcess] = Queue()
+        self.refill_requests: Queue[bool | None] = Queue()
+        self.refiller = Thread(target=self.__refill__, daemon=True, name="warm-pool")
+
+        for _ in range(size):
+            self.refill_requests.put(True)
+        self.refiller.start()
+
+    def __refill__(self):
+        while self.refill_requests.get() is not None:
+            if self.closed:
+                break
+            self.idle.put(self.factory())
+
+    def acquire(self) -> SolverProcess:
+        while True:
+            try:
+                process = self.idle.get_nowait()
+            except Empty:
+                return self.factory()
+
+            self.refill_requests.put(True)
+            if process.alive():
+                return process
+
+            process.close()
+
+    def close(self):
+        self.closed = True
+        self.refill_requests.put(None)
+        self.refiller.join()
+
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except Empty:
+                break
@@ -1,17 +1,43 @@
 import argparse
+import enum
 import os
+import sys
+from collections import Counter
+from multiprocessing import Pool
+from pathlib import Path
+from time import perf_counter
+
 from mus2muc.ltlf_parser import parse_formula_as_object
+from mus2muc.ltlf_parser.parser import OBJECT_GRAMMAR_PATH, get_parser
 from mus2muc.ltlf_parser.syntax import Conjunction
-from pathlib import Path
+
+
+class Conversion(enum.StrEnum):
+    CONVERTED = "converted"
+    NOT_CONJUNCTIVE = "not conjunctive"
+    PARSE_ERROR = "parse error"
 
 
 def parse_args():
     p = argparse.ArgumentParser()
     p.add_argument("root_folder", type=str)
     p.add_argument("target_folder", type=str)
+    p.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes; 1 converts in the calling process.",
+    )
+    p.add_argument(
+        "--chunk-size",
+        type=int,
+        default=64,
+        help="Number of files handed to a worker at once.",
+    )
 
     args = p.parse_args()
-    return args.root_folder, args.target_folder
+    return args
 
 
 def recurse_on_formula(formula):
@@ -29,40 +55,94 @@ def recurse_on_formula(formula):
 
 
 def check_if_conjunctive(formula_path):
+    # Returns the conjuncts of the formula, and the outcome of the check.
     try:
         formula_object = parse_formula_as_object(Path(formula_path).open().read())
-        if not isinstance(formula_object, Conjunction):
-            print(formula_path, "is not a conjunction, would have a single MUS...")
-            return []
+    except Exception:
+        return [], Conversion.PARSE_ERROR
 
-        return recurse_on_formula(formula_object)
+    if not isinstance(formula_object, Conjunction):
+        return [], Conversion.NOT_CONJUNCTIVE
 
-    except:
-        print(formula_path, "does not have a compatible grammar.")
-        return []
+    return recurse_on_formula(formula_object), Conversion.CONVERTED
 
 
-def main():
-    root_folder, target_folder = parse_args()
+def convert(formula_path, target_folder):
+    children, outcome = check_if_conjunctive(formula_path)
+    if outcome is not Conversion.CONVERTED:
+        return formula_path, outcome
+
+    subfolder_structure = formula_path.split(os.path.sep)[1:-1]
+    name = Path(formula_path).name
+    output_folder = Path(target_folder, *subfolder_structure)
+
+    os.makedirs(output_folder, exist_ok=True)
+
+    # The whole file is written at once.
+    content = "".join(
+        f"P{conjid} := {conjunct};\n" for conjid, conjunct in enumerate(children)
+    )
+    (output_folder / name).write_text(content)
+    return formula_path, outcome
+
 
+def list_formulas(root_folder):
+    # Only the leaf folders of the tree hold formulas.
     for subfolder, dirs, files in os.walk(root_folder):
         if len(dirs) != 0:
             continue
 
         for f in files:
-            formula_path = os.path.sep.join([subfolder, f])
-            children = check_if_conjunctive(formula_path)
-            if len(children) > 0:
-                subfolder_structure = formula_path.split(os.path.sep)[1:-1]
-                name = Path(formula_path).name
-                output_folder = Path(target_folder, *subfolder_structure)
-
-                os.makedirs(output_folder, exist_ok=True)
-
-                output_file = output_folder / name
-                with output_file.open("w") as f:
-                    # print("Writing", formula_path, "to", output_file)
-                    for conjid, conjunct in enumerate(children):
-                        f.write(f"P{conjid} := {conjunct};")
-                        f.write("\n")
-                        f.flush()
+            yield os.path.sep.join([subfolder, f])
+
+
+def __convert_task__(task):
+    return convert(*task)
+
+
+def __init_worker__():
+    # Each worker builds the parser once, before its first file.
+    get_parser(OBJECT_GRAMMAR_PATH)
+
+
+def main():
+    args = parse_args()
+    tasks = (
+        (formula_path, args.target_folder)
+        for formula_path in list_formulas(args.root_folder)
+    )
+
+    start = perf_counter()
+    outcomes = Counter()
+    failures = []
+
+    if args.jobs == 1:
+        results = map(__convert_task__, tasks)
+        pool = None
+    else:
+        pool = Pool(args.jobs, initializer=__init_worker__)
+        results = pool.imap_unordered(
+            __convert_task__, tasks, chunksize=args.chunk_size
+        )
+
+    try:
+        for formula_path, outcome in results:
+            outcomes[outcome] += 1
+            if outcome is Conversion.PARSE_ERROR:
+                failures.append(formula_path)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    elapsed = perf_counter() - start
+    total = sum(outcomes.values())
+    throughput = total / elapsed if elapsed > 0 else 0.0
+    print(f"Processed {total} files in {elapsed:.2f}s ({throughput:.1f} files/s)")
+    for outcome in Conversion:
+        print(f"  {outcome}: {outcomes[outcome]}")
+
+    if len(failures) > 0:
+        print("Files that do not have a compatible grammar:", file=sys.stderr)
+        for formula_path in sorted(failures):
+            print(" ", formula_path, file=sys.stderr)
@@ -1,4 +1,6 @@
+import os
 import sys
+from pathlib import Path
 from time import perf_counter
 
 
@@ -9,11 +11,20 @@ class Logger:
     @staticmethod
     def log(message):
         timestamp = perf_counter() - Logger.start
-        print(
-            Logger.LOG_LINE.format(timestamp=timestamp, message=message),
-            file=sys.stderr,
+        # A single write, so that lines from batch workers do not interleave.
+        sys.stderr.write(
+            Logger.LOG_LINE.format(timestamp=timestamp, message=message) + "\n"
         )
 
 
 def log(message):
     Logger.log(message)
+
+
+def cache_directory() -> Path:
+    # MUS2MUC_CACHE_DIR, or the mus2muc folder of the XDG cache directory.
+    if "MUS2MUC_CACHE_DIR" in os.environ:
+        return Path(os.environ["MUS2MUC_CACHE_DIR"])
+
+    xdg_cache = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+    return Path(xdg_cache) / "mus2muc"
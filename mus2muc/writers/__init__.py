@@ -1,2 +1,3 @@
 from .output_writer import OutputWriter
 from .verbose_writer import VerboseWriter
+from .binary_writer import BinaryWriter
@@ -0,0 +1,287 @@
+import json
+import struct
+import sys
+from argparse import ArgumentParser
+from collections.abc import Iterator
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+from mus2muc.interfaces import MUS, CertifierOutput, ConjunctMapping, MUCWriter
+from mus2muc.utils import Logger
+
+# A log is a sequence of segments, one per run appended to the file. A
+# segment starts with MAGIC and a length-prefixed JSON header holding the
+# conjuncts, in id order, with their formulas. Each event is a record: a
+# one-byte event type, then fixed-size fields. Conjunct sets are bitsets
+# over the conjunct ids, stored in little-endian order on as many bytes as
+# the segment needs; times and timestamps are float64.
+MAGIC = b"M2MLOG1\n"
+LENGTH = struct.Struct("<I")
+
+FOUND_MUS = 1
+FOUND_MUC = 2
+NOT_A_MUC = 3
+SKIP_MUS = 4
+EMPTY_MUS = 5
+GENERATOR_RESTART = 6
+METRICS = 7
+UNKNOWN_MUS = 8
+
+# k, then mus-compute-time and the timestamp of the MUS.
+MUS_FIELDS = struct.Struct("<Idd")
+# id, core-compute-time and the certification timestamp.
+MUC_FIELDS = struct.Struct("<Idd")
+# Model length (-1 if missing), core-compute-time and the certification timestamp.
+NOT_A_MUC_FIELDS = struct.Struct("<idd")
+# core-compute-time and the certification timestamp.
+UNKNOWN_MUS_FIELDS = struct.Struct("<dd")
+# k and the restart timestamp.
+RESTART_FIELDS = struct.Struct("<Id")
+# The end timestamp, then a length-prefixed JSON summary.
+METRICS_FIELDS = struct.Struct("<d")
+
+EVENT_NAMES = {
+    FOUND_MUS: "FOUND_MUS",
+    FOUND_MUC: "FOUND_MUC",
+    NOT_A_MUC: "NOT_A_MUC",
+    SKIP_MUS: "SKIP_MUS",
+    EMPTY_MUS: "EMPTY_MUS",
+    UNKNOWN_MUS: "UNKNOWN_MUS",
+}
+
+
+class BinaryWriter(MUCWriter):
+    # Writes every event, as VerboseWriter does, as binary records. The
+    # output is converted to the JSON schemas by `mus2muc-log`.
+    def __init__(self, output_file, mapping: ConjunctMapping, **options):
+        if output_file is None:
+            raise ValueError("The binary event log must be written to a file.")
+        options.pop("serializer", None)
+        options.pop("include_formula", None)
+        super().__init__(output_file, mapping, **options)
+        self.bitset_size = (len(mapping) + 7) // 8
+
+    def __open__(self):
+        handle = open(self.output_file, "ab", buffering=2**16)
+        header = json.dumps(
+            {"conjuncts": list(self.mapping.mapping), "formulas": self.mapping.mapping}
+        ).encode("utf-8")
+        handle.write(MAGIC + LENGTH.pack(len(header)) + header)
+        return handle
+
+    def __bitset__(self, mus: MUS) -> bytes:
+        return mus.conjuncts.to_bytes(self.bitset_size, "little")
+
+    def __mus_record__(self, event: int, mus: MUS) -> bytes:
+        return (
+            bytes((event,))
+            + self.__bitset__(mus)
+            + MUS_FIELDS.pack(mus.k, mus.mus_compute_time, mus.timestamp)
+        )
+
+    def found_a_mus(self, mus: MUS):
+        self.__write_record__(self.__mus_record__(FOUND_MUS, mus))
+
+    def mus_is_a_muc(self, mus: MUS, cert_out: CertifierOutput):
+        self.__write_record__(
+            self.__mus_record__(FOUND_MUC, mus)
+            + MUC_FIELDS.pack(
+                self.id, cert_out.core_computation_time, cert_out.timestamp
+            )
+        )
+        self.id += 1
+
+    def mus_is_a_false_positive(self, mus: MUS, cert_out: CertifierOutput):
+        model_length = cert_out.witness_model_length
+        self.__write_record__(
+            self.__mus_record__(NOT_A_MUC, mus)
+            + NOT_A_MUC_FIELDS.pack(
+                -1 if model_length is None else model_length,
+                cert_out.core_computation_time,
+                cert_out.timestamp,
+            )
+        )
+
+    def mus_is_unknown(self, mus: MUS, cert_out: CertifierOutput):
+        self.__write_record__(
+            self.__mus_record__(UNKNOWN_MUS, mus)
+            + UNKNOWN_MUS_FIELDS.pack(
+                cert_out.core_computation_time, cert_out.timestamp
+            )
+        )
+
+    def mus_is_skipped(self, mus: MUS):
+        self.__write_record__(self.__mus_record__(SKIP_MUS, mus))
+
+    def found_empty_mus(self, mus: MUS):
+        self.__write_record__(self.__mus_record__(EMPTY_MUS, mus))
+
+    def generator_restart(self, k: int):
+        self.__write_record__(
+            bytes((GENERATOR_RESTART,))
+            + RESTART_FIELDS.pack(k, perf_counter() - Logger.start)
+        )
+
+    def run_metrics(self, summary):
+        payload = json.dumps(summary).encode("utf-8")
+        self.__write_record__(
+            bytes((METRICS,))
+            + METRICS_FIELDS.pack(perf_counter() - Logger.start)
+            + LENGTH.pack(len(payload))
+            + payload
+        )
+
+
+def read_events(path: Path) -> Iterator[dict[str, Any]]:
+    # Yields the events of the log as dictionaries of the verbose JSON
+    # schema, formula included.
+    data = Path(path).read_bytes()
+    position = 0
+    mapping = None
+    bitset_size = 0
+
+    while position < len(data):
+        if data.startswith(MAGIC, position):
+            position += len(MAGIC)
+            (size,) = LENGTH.unpack_from(data, position)
+            position += LENGTH.size
+            header = json.loads(data[position : position + size])
+            position += size
+            mapping = ConjunctMapping(header["formulas"])
+            bitset_size = (len(mapping) + 7) // 8
+            continue
+
+        event = data[position]
+        position += 1
+
+        if event == GENERATOR_RESTART:
+            k, restart = RESTART_FIELDS.unpack_from(data, position)
+            position += RESTART_FIELDS.size
+            yield {
+                "event": "GENERATOR_RESTART",
+                "k": k,
+                "timestamps": {"restart": restart},
+            }
+            continue
+
+        if event == METRICS:
+            (end,) = METRICS_FIELDS.unpack_from(data, position)
+            position += METRICS_FIELDS.size
+            (size,) = LENGTH.unpack_from(data, position)
+            position += LENGTH.size
+            summary = json.loads(data[position : position + size])
+            position += size
+            yield {"event": "METRICS", "metrics": summary, "timestamps": {"end": end}}
+            continue
+
+        bits = int.from_bytes(data[position : position + bitset_size], "little")
+        atoms = list(mapping.labels_of(bits))
+        position += bitset_size
+        k, mus_compute_time, mus_timestamp = MUS_FIELDS.unpack_from(data, position)
+        position += MUS_FIELDS.size
+
+        output = {
+            "event": EVENT_NAMES[event],
+            "objective_atoms": atoms,
+            "size": len(atoms),
+            "k": k,
+        }
+
+        if event == FOUND_MUC:
+            muc_id, core_compute_time, certified = MUC_FIELDS.unpack_from(
+                data, position
+            )
+            position += MUC_FIELDS.size
+            output = {
+                "event": "FOUND_MUC",
+                "id": muc_id,
+                "objective_atoms": atoms,
+                "size": len(atoms),
+                "formula": mapping.formula_given_bits(bits),
+                "k": k,
+                "mus-compute-time": mus_compute_time,
+                "core-compute-time": core_compute_time,
+                "timestamps": {"mus": mus_timestamp, "certified": certified},
+            }
+
+        elif event == NOT_A_MUC:
+            model_length, core_compute_time, cert = NOT_A_MUC_FIELDS.unpack_from(
+                data, position
+            )
+            position += NOT_A_MUC_FIELDS.size
+            output.update(
+                {
+                    "model_length": None if model_length < 0 else model_length,
+                    "mus-compute-time": mus_compute_time,
+                    "core-compute-time": core_compute_time,
+                    "timestamps": {"mus": mus_timestamp, "cert": cert},
+                }
+            )
+
+        elif event == UNKNOWN_MUS:
+            core_compute_time, cert = UNKNOWN_MUS_FIELDS.unpack_from(data, position)
+            position += UNKNOWN_MUS_FIELDS.size
+            output.update(
+                {
+                    "mus-compute-time": mus_compute_time,
+                    "core-compute-time": core_compute_time,
+                    "timestamps": {"mus": mus_timestamp, "cert": cert},
+                }
+            )
+
+        else:
+            if event == FOUND_MUS:
+                output["formula"] = mapping.formula_given_bits(bits)
+            output.update(
+                {
+                    "mus-compute-time": mus_compute_time,
+                    "timestamps": {"mus": mus_timestamp},
+                }
+            )
+
+        yield output
+
+
+def as_output_schema(event: dict[str, Any]) -> dict[str, Any]:
+    # The schema of OutputWriter, for FOUND_MUC events.
+    return {
+        "id": event["id"],
+        "conjuncts": event["objective_atoms"],
+        "size": event["size"],
+        "formula": event["formula"],
+        "k": event["k"],
+        "mus-compute-time": event["mus-compute-time"],
+        "core-compute-time": event["core-compute-time"],
+        "timestamps": event["timestamps"],
+    }
+
+
+def main():
+    parser = ArgumentParser(prog="mus2muc-log")
+    parser.add_argument(
+        "log", type=Path, help="Binary event log, written with --output-format binary."
+    )
+    parser.add_argument(
+        "--mucs-only",
+        action="store_true",
+        help="Only convert the MUCs, in the schema of the non-verbose output.",
+    )
+    parser.add_argument(
+        "--no-formula",
+        dest="include_formula",
+        action="store_false",
+        help="Leave the formula out of the output.",
+    )
+    args = parser.parse_args()
+
+    for event in read_events(args.log):
+        if args.mucs_only:
+            if event["event"] != "FOUND_MUC":
+                continue
+            event = as_output_schema(event)
+
+        if not args.include_formula:
+            event.pop("formula", None)
+
+        sys.stdout.write(json.dumps(event) + "\n")
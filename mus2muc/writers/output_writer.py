@@ -1,33 +1,44 @@
 import json
+
 from mus2muc.interfaces import MUS, CertifierOutput, MUCWriter
+from mus2muc.utils import log
+from mus2muc.writers.serializers import JSONSerializer
 
 
 class OutputWriter(MUCWriter):
-    def __init__(self, output_file, mapping):
-        super().__init__(output_file, mapping)
+    def __init__(self, output_file, mapping, serializer=None, **options):
+        super().__init__(
+            output_file, mapping, serializer=serializer or JSONSerializer(), **options
+        )
 
     def found_a_mus(self, mus: MUS):
         pass
 
     def mus_is_a_muc(self, mus: MUS, cert_out: CertifierOutput):
-        formula = self.mapping.formula_given_indices(mus.objective_atoms)
         output = {
             "id": self.id,
-            "conjuncts": mus.objective_atoms,
+            "conjuncts": self.__labels__(mus),
             "size": mus.size,
-            "formula": formula,
-            "k": mus.k,
-            "mus-compute-time": mus.mus_compute_time,
-            "core-compute-time": cert_out.core_computation_time,
-            "timestamps": {"mus": mus.timestamp, "certified": cert_out.timestamp},
         }
+        self.__add_formula__(output, mus)
+        output.update(
+            {
+                "k": mus.k,
+                "mus-compute-time": mus.mus_compute_time,
+                "core-compute-time": cert_out.core_computation_time,
+                "timestamps": {"mus": mus.timestamp, "certified": cert_out.timestamp},
+            }
+        )
         self.id += 1
 
-        self.__write__(json.dumps(output))
+        self.__emit__(output)
 
     def mus_is_a_false_positive(self, mus: MUS, cert_out: CertifierOutput):
         pass
 
+    def mus_is_unknown(self, mus: MUS, cert_out: CertifierOutput):
+        pass
+
     def mus_is_skipped(self, mus: MUS):
         pass
 
@@ -36,3 +47,7 @@ class OutputWriter(MUCWriter):
 
     def generator_restart(self, k: int):
         pass
+
+    def run_metrics(self, summary):
+        # The output only holds MUCs: the summary goes to the log.
+        log(f"Metrics: {json.dumps(summary)}")
@@ -0,0 +1,38 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any
+
+from mus2muc.interfaces import SerializerType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class Serializer(ABC):
+    @abstractmethod
+    def dumps(self, output: dict[str, Any]) -> str:
+        pass
+
+
+class JSONSerializer(Serializer):
+    def dumps(self, output: dict[str, Any]) -> str:
+        return json.dumps(output)
+
+
+class ORJSONSerializer(Serializer):
+    # orjson is an optional dependency (the `fast` extra). Its output is
+    # compact: no spaces after separators.
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError("The orjson serializer requires the orjson package.")
+
+    def dumps(self, output: dict[str, Any]) -> str:
+        return orjson.dumps(output).decode("utf-8")
+
+
+def get_serializer(t: SerializerType) -> Serializer:
+    if t == SerializerType.ORJSON:
+        return ORJSONSerializer()
+    return JSONSerializer()
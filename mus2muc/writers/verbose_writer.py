@@ -1,31 +1,36 @@
-import json
 from time import perf_counter
 
 from mus2muc.interfaces import MUS, CertifierOutput, MUCWriter
 from mus2muc.utils import Logger
+from mus2muc.writers.serializers import JSONSerializer
 
 
 class VerboseWriter(MUCWriter):
-    def __init__(self, output_file, mapping):
-        super().__init__(output_file, mapping)
+    def __init__(self, output_file, mapping, serializer=None, **options):
+        super().__init__(
+            output_file, mapping, serializer=serializer or JSONSerializer(), **options
+        )
 
     def found_a_mus(self, mus: MUS):
-        formula = self.mapping.formula_given_indices(mus.objective_atoms)
         output = {
             "event": "FOUND_MUS",
-            "objective_atoms": mus.objective_atoms,
+            "objective_atoms": self.__labels__(mus),
             "size": mus.size,
             "k": mus.k,
-            "formula": formula,
-            "mus-compute-time": mus.mus_compute_time,
-            "timestamps": {"mus": mus.timestamp},
         }
-        self.__write__(json.dumps(output))
+        self.__add_formula__(output, mus)
+        output.update(
+            {
+                "mus-compute-time": mus.mus_compute_time,
+                "timestamps": {"mus": mus.timestamp},
+            }
+        )
+        self.__emit__(output)
 
     def mus_is_a_false_positive(self, mus: MUS, cert_out: CertifierOutput):
         output = {
             "event": "NOT_A_MUC",
-            "objective_atoms": mus.objective_atoms,
+            "objective_atoms": self.__labels__(mus),
             "size": mus.size,
             "k": mus.k,
             "model_length": cert_out.witness_model_length,
@@ -33,45 +38,68 @@ class VerboseWriter(MUCWriter):
             "core-compute-time": cert_out.core_computation_time,
             "timestamps": {"mus": mus.timestamp, "cert": cert_out.timestamp},
         }
-        self.__write__(json.dumps(output))
+        self.__emit__(output)
 
     def mus_is_a_muc(self, mus: MUS, cert_out: CertifierOutput):
-        formula = self.mapping.formula_given_indices(mus.objective_atoms)
         output = {
             "event": "FOUND_MUC",
             "id": self.id,
-            "objective_atoms": mus.objective_atoms,
+            "objective_atoms": self.__labels__(mus),
+            "size": mus.size,
+        }
+        self.__add_formula__(output, mus)
+        output.update(
+            {
+                "k": mus.k,
+                "mus-compute-time": mus.mus_compute_time,
+                "core-compute-time": cert_out.core_computation_time,
+                "timestamps": {"mus": mus.timestamp, "certified": cert_out.timestamp},
+            }
+        )
+        self.id += 1
+        self.__emit__(output)
+
+    def mus_is_unknown(self, mus: MUS, cert_out: CertifierOutput):
+        output = {
+            "event": "UNKNOWN_MUS",
+            "objective_atoms": self.__labels__(mus),
             "size": mus.size,
-            "formula": formula,
             "k": mus.k,
             "mus-compute-time": mus.mus_compute_time,
             "core-compute-time": cert_out.core_computation_time,
-            "timestamps": {"mus": mus.timestamp, "certified": cert_out.timestamp},
+            "timestamps": {"mus": mus.timestamp, "cert": cert_out.timestamp},
         }
-        self.id += 1
-        self.__write__(json.dumps(output))
+        self.__emit__(output)
 
     def mus_is_skipped(self, mus: MUS):
         output = {
             "event": "SKIP_MUS",
-            "objective_atoms": mus.objective_atoms,
+            "objective_atoms": self.__labels__(mus),
             "size": mus.size,
             "k": mus.k,
             "mus-compute-time": mus.mus_compute_time,
             "timestamps": {"mus": mus.timestamp},
         }
-        self.__write__(json.dumps(output))
+        self.__emit__(output)
 
     def found_empty_mus(self, mus: MUS):
         output = {
             "event": "EMPTY_MUS",
-            "objective_atoms": mus.objective_atoms,
+            "objective_atoms": self.__labels__(mus),
             "size": mus.size,
             "k": mus.k,
             "mus-compute-time": mus.mus_compute_time,
             "timestamps": {"mus": mus.timestamp},
         }
-        self.__write__(json.dumps(output))
+        self.__emit__(output)
+
+    def run_metrics(self, summary):
+        output = {
+            "event": "METRICS",
+            "metrics": summary,
+            "timestamps": {"end": perf_counter() - Logger.start},
+        }
+        self.__emit__(output)
 
     def generator_restart(self, k):
         output = {
@@ -79,4 +107,4 @@ class VerboseWriter(MUCWriter):
             "k": k,
             "timestamps": {"restart": perf_counter() - Logger.start},
         }
-        self.__write__(json.dumps(output))
+        self.__emit__(output)
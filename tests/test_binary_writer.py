@@ -0,0 +1,82 @@
+import json
+import sys
+
+import pytest
+
+from mus2muc.interfaces import MUS, CertifierOutput, ConjunctMapping, MUCStatus
+from mus2muc.writers import binary_writer, verbose_writer
+from mus2muc.writers.binary_writer import BinaryWriter, main, read_events
+from mus2muc.writers.output_writer import OutputWriter
+from mus2muc.writers.verbose_writer import VerboseWriter
+
+# More than 8 conjuncts, so that bitsets take more than one byte.
+MAPPING = ConjunctMapping({f"P{i}": f"F(a{i})" for i in range(10)})
+
+
+def write_every_event(writer):
+    first = MUS(2, MAPPING.bitset(["P0", "P9"]), 1.5, 0.25)
+    second = MUS(4, MAPPING.bitset(["P1", "P2", "P3"]), 2.5, 0.5)
+
+    writer.generator_restart(2)
+    writer.found_a_mus(first)
+    writer.mus_is_a_false_positive(
+        first, CertifierOutput(1.75, 0.125, 3, MUCStatus.SATISFIABLE)
+    )
+    writer.mus_is_a_false_positive(
+        first, CertifierOutput(1.8, 0.1, None, MUCStatus.SATISFIABLE)
+    )
+    writer.generator_restart(4)
+    writer.found_a_mus(second)
+    writer.mus_is_a_muc(
+        second, CertifierOutput(2.75, 0.0625, None, MUCStatus.UNSATISFIABLE)
+    )
+    writer.mus_is_unknown(first, CertifierOutput(3.0, 1.0, None, MUCStatus.UNKNOWN))
+    writer.mus_is_skipped(second)
+    writer.found_empty_mus(MUS(4, 0, 3.5, 0.75))
+    writer.run_metrics({"timers": {"grounding": 1.0}, "counters": {}})
+    writer.close()
+
+
+@pytest.fixture(autouse=True)
+def fixed_clock(monkeypatch):
+    # Restart and metrics events are timestamped when they are written.
+    monkeypatch.setattr(binary_writer, "perf_counter", lambda: 42.0)
+    monkeypatch.setattr(verbose_writer, "perf_counter", lambda: 42.0)
+
+
+def test_round_trip_matches_verbose_output(tmp_path):
+    write_every_event(BinaryWriter(tmp_path / "log.bin", MAPPING))
+    write_every_event(VerboseWriter(tmp_path / "verbose.jsonl", MAPPING))
+
+    expected = [json.loads(line) for line in (tmp_path / "verbose.jsonl").open()]
+    assert list(read_events(tmp_path / "log.bin")) == expected
+    assert {event["event"] for event in expected} == {
+        "GENERATOR_RESTART",
+        "FOUND_MUS",
+        "NOT_A_MUC",
+        "FOUND_MUC",
+        "UNKNOWN_MUS",
+        "SKIP_MUS",
+        "EMPTY_MUS",
+        "METRICS",
+    }
+
+
+def test_appended_runs_are_read_in_order(tmp_path):
+    write_every_event(BinaryWriter(tmp_path / "log.bin", MAPPING))
+    write_every_event(BinaryWriter(tmp_path / "log.bin", MAPPING))
+
+    events = list(read_events(tmp_path / "log.bin"))
+    assert events[: len(events) // 2] == events[len(events) // 2 :]
+
+
+def test_converter_output(tmp_path, monkeypatch, capsys):
+    write_every_event(BinaryWriter(tmp_path / "log.bin", MAPPING))
+    write_every_event(OutputWriter(tmp_path / "output.jsonl", MAPPING))
+
+    monkeypatch.setattr(
+        sys, "argv", ["mus2muc-log", str(tmp_path / "log.bin"), "--mucs-only"]
+    )
+    main()
+    converted = capsys.readouterr().out.splitlines()
+    assert converted == (tmp_path / "output.jsonl").read_text().splitlines()
@@ -0,0 +1,44 @@
+from mus2muc.certification_cache import CertificationCache
+from mus2muc.interfaces import ConjunctMapping, MUCStatus
+
+MAPPING = ConjunctMapping({"P1": "G(a -> X(b))", "P2": "F(a)", "P3": "G(!b)"})
+
+
+def test_hit_on_permuted_and_reformatted_conjuncts(tmp_path):
+    path = tmp_path / "certifications.sqlite3"
+    cache = CertificationCache(path, MAPPING)
+    cache.put(0b011, MUCStatus.SATISFIABLE, 3)
+    cache.put(0b111, MUCStatus.UNSATISFIABLE, None)
+    cache.close()
+
+    # Other labels, another order, and other spacing and parentheses.
+    renamed = ConjunctMapping({"Q1": "G (!b)", "Q2": "F a", "Q3": "G(a->X b)"})
+    cache = CertificationCache(path, renamed)
+    assert cache.get(0b110) == (MUCStatus.SATISFIABLE, 3)
+    assert cache.get(0b111) == (MUCStatus.UNSATISFIABLE, None)
+    assert cache.get(0b011) is None
+    cache.close()
+
+
+def test_duplicate_formulas_share_an_entry(tmp_path):
+    cache = CertificationCache(
+        tmp_path / "certifications.sqlite3",
+        ConjunctMapping({"P1": "F(a)", "P2": "F a", "P3": "G(!a)"}),
+    )
+    cache.put(0b101, MUCStatus.UNSATISFIABLE, None)
+
+    assert cache.get(0b110) == (MUCStatus.UNSATISFIABLE, None)
+    assert cache.get(0b111) == (MUCStatus.UNSATISFIABLE, None)
+    cache.close()
+
+
+def test_unknown_is_not_stored(tmp_path):
+    path = tmp_path / "certifications.sqlite3"
+    cache = CertificationCache(path, MAPPING)
+    cache.put(0b111, MUCStatus.UNKNOWN, None)
+    assert cache.get(0b111) is None
+
+    cache.put(0b111, MUCStatus.UNSATISFIABLE, None)
+    cache.put(0b111, MUCStatus.UNKNOWN, None)
+    assert cache.get(0b111) == (MUCStatus.UNSATISFIABLE, None)
+    cache.close()
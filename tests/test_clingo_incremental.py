@@ -0,0 +1,100 @@
+from pathlib import Path
+
+import pytest
+
+from mus2muc.certifiers.bounded import BoundedChecker
+from mus2muc.certifiers.clingo_incremental import ClingoCertifier
+from mus2muc.enumeration import LTLF2ASP_INCREMENTAL_ENCODING_PATH
+from mus2muc.generators import ClingoIncrementalGenerator
+from mus2muc.generators.clingo_incremental import MapSolver
+from mus2muc.interfaces import MUS, ConjunctMapping, MUCStatus
+from mus2muc.ltlf_parser import annotate_formulae
+
+EXAMPLE = Path(__file__).parent.parent / "example.ltlfconj"
+
+
+@pytest.fixture
+def example():
+    formula_string = EXAMPLE.read_text()
+    return ConjunctMapping.from_formula_string(formula_string), annotate_formulae(
+        formula_string
+    )
+
+
+def test_map_solver_seeds():
+    solver = MapSolver(3)
+    assert solver.seed() == frozenset({0, 1, 2})
+
+    solver.block_up(frozenset({0, 1, 2}))
+    solver.block_down(frozenset({0, 1}))
+    assert solver.seed() in (frozenset({0, 2}), frozenset({1, 2}))
+
+    solver.unblock_up(frozenset({0, 1, 2}))
+    assert solver.blocked_up() == []
+    assert solver.seed() == frozenset({0, 1, 2})
+
+    solver.block_up_permanently(frozenset({2}))
+    solver.block_down(frozenset({0, 1}))
+    assert solver.seed() is None
+
+
+def test_example_mucs(example):
+    # MUSes with a witness restart the generator at the length of the
+    # witness; the others are the MUCs of the example.
+    mapping, annotated_program = example
+    generator = ClingoIncrementalGenerator(
+        1, annotated_program, LTLF2ASP_INCREMENTAL_ENCODING_PATH, mapping
+    )
+    checker = BoundedChecker(
+        mapping, annotated_program, LTLF2ASP_INCREMENTAL_ENCODING_PATH
+    )
+    checker.extend(8)
+
+    generator.start()
+    mucs = set()
+    restarts = []
+    while muses := generator.get_muses():
+        for mus in muses:
+            witness = checker.shortest(mus.conjuncts, above=mus.k)
+            if witness is None:
+                mucs.add(mapping.labels_of(mus.conjuncts))
+                generator.block(mus)
+            else:
+                restarts.append((mapping.labels_of(mus.conjuncts), witness))
+                generator.set_horizon_and_restart(witness)
+                break
+
+    assert mucs == {("P2", "P3", "P4"), ("P1", "P3", "P4")}
+    assert restarts == [(("P1", "P3"), 2)]
+
+
+def test_restart_drops_satisfiable_muses(example):
+    mapping, annotated_program = example
+    generator = ClingoIncrementalGenerator(
+        1, annotated_program, LTLF2ASP_INCREMENTAL_ENCODING_PATH, mapping
+    )
+    generator.start()
+    p1_p3 = mapping.bitset(["P1", "P3"])
+    assert p1_p3 in [mus.conjuncts for mus in generator.get_muses()]
+
+    generator.set_horizon_and_restart(2)
+    found = []
+    while muses := generator.get_muses():
+        found.extend(mus.conjuncts for mus in muses)
+    assert p1_p3 not in found
+    assert mapping.bitset(["P1", "P3", "P4"]) in found
+
+
+def test_clingo_certifier_rejects_with_witness(example):
+    mapping, annotated_program = example
+    certifier = ClingoCertifier(
+        mapping, annotated_program, LTLF2ASP_INCREMENTAL_ENCODING_PATH, bound=8
+    )
+
+    output = certifier.certify(MUS(1, mapping.bitset(["P1", "P3"]), 0.0, 0.0))
+    assert output.result == MUCStatus.SATISFIABLE
+    assert output.witness_model_length == 2
+
+    # Without a fallback, a MUC has no witness up to the bound.
+    output = certifier.certify(MUS(2, mapping.bitset(["P1", "P3", "P4"]), 0.0, 0.0))
+    assert output.result == MUCStatus.UNKNOWN
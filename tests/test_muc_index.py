@@ -0,0 +1,56 @@
+from mus2muc.enumeration.muc_index import MUCIndex, MUCRelation
+from mus2muc.interfaces import MUS, ConjunctMapping
+
+
+def mus(bits: int) -> MUS:
+    return MUS(1, bits, 0.0, 0.0)
+
+
+def index_of(*mucs: int) -> MUCIndex:
+    index = MUCIndex(ConjunctMapping({f"P{i}": "a" for i in range(6)}))
+    for bits in mucs:
+        index.add_if_not_contained(mus(bits))
+    return index
+
+
+def test_relation():
+    index = index_of(0b000111, 0b011000)
+
+    assert index.relation(mus(0b000111)) == MUCRelation.EQUAL
+    assert index.relation(mus(0b100111)) == MUCRelation.SUPERSET
+    assert index.relation(mus(0b011001)) == MUCRelation.SUPERSET
+    assert index.relation(mus(0b000011)) == MUCRelation.SUBSET
+    assert index.relation(mus(0b010000)) == MUCRelation.SUBSET
+    assert index.relation(mus(0b001001)) == MUCRelation.UNRELATED
+    assert index.relation(mus(0b100000)) == MUCRelation.UNRELATED
+    assert index.relation(mus(0)) == MUCRelation.UNRELATED
+
+
+def test_dominates_equal_and_supersets_only():
+    index = index_of(0b000111, 0b011000)
+
+    assert index.dominates(mus(0b000111))
+    assert index.dominates(mus(0b111111))
+    assert index.dominates(mus(0b011100))
+    assert not index.dominates(mus(0b000011))
+    assert not index.dominates(mus(0b110100))
+    assert not index.dominates(mus(0))
+
+
+def test_empty_index():
+    index = index_of()
+
+    assert len(index) == 0
+    assert not index.dominates(mus(0b111111))
+    assert index.relation(mus(0b000001)) == MUCRelation.UNRELATED
+
+
+def test_add_if_not_contained():
+    index = index_of(0b000101)
+
+    assert not index.add_if_not_contained(mus(0b000101))
+    assert index.add_if_not_contained(mus(0b000110))
+    assert len(index) == 2
+    assert index.contains(mus(0b000110))
+    assert not index.contains(mus(0b000100))
+    assert index.relation(mus(0b000100)) == MUCRelation.SUBSET
@@ -0,0 +1,127 @@
+from itertools import combinations
+
+import pytest
+
+from mus2muc.certifiers.bounded import BoundedChecker
+from mus2muc.certifiers.propositional import PropositionalAbstraction
+from mus2muc.enumeration import LTLF2ASP_INCREMENTAL_ENCODING_PATH
+from mus2muc.interfaces import ConjunctMapping, MUCStatus
+from mus2muc.ltlf_parser import annotate_formulae
+from mus2muc.ltlf_parser.syntax import Until
+
+# One conjunct per operator, and some that contradict them on the first state.
+# Weak next is left out: the encodings do not translate it.
+FORMULAS = [
+    "a",
+    "!a",
+    "!b",
+    "true",
+    "false",
+    "X(a)",
+    "X(true)",
+    "F(a)",
+    "F(!a)",
+    "G(a)",
+    "G(!a)",
+    "a U b",
+    "a R b",
+    "a W b",
+    "a M b",
+    "a -> b",
+    "a <-> b",
+    "a | b",
+    "a & b",
+]
+HORIZON = 6
+
+
+def conjunct_sets():
+    for size in (1, 2, 3):
+        for conjuncts in combinations(range(len(FORMULAS)), size):
+            yield sum(1 << c for c in conjuncts)
+
+
+def formula_string(formulas):
+    return "\n".join(f"P{i} := {f};" for i, f in enumerate(formulas))
+
+
+@pytest.fixture(scope="module")
+def mapping():
+    return ConjunctMapping.from_formula_string(formula_string(FORMULAS))
+
+
+@pytest.fixture(scope="module")
+def checker(mapping):
+    checker = BoundedChecker(
+        mapping,
+        annotate_formulae(formula_string(FORMULAS)),
+        LTLF2ASP_INCREMENTAL_ENCODING_PATH,
+    )
+    checker.extend(HORIZON)
+    return checker
+
+
+def test_agrees_with_bounded_checker(mapping, checker):
+    abstraction = PropositionalAbstraction(mapping)
+    assert abstraction.unsupported == 0
+
+    for conjuncts in conjunct_sets():
+        status, witness_length = abstraction.check(conjuncts)
+        single = checker.check(conjuncts, 1) == 1
+        # Exact on traces of length 1, sound on longer ones.
+        assert (status == MUCStatus.SATISFIABLE) == single, bin(conjuncts)
+        if status == MUCStatus.SATISFIABLE:
+            assert witness_length == 1
+        if status == MUCStatus.UNSATISFIABLE:
+            assert checker.check(conjuncts, HORIZON) is None, bin(conjuncts)
+
+
+def test_verdicts(mapping):
+    abstraction = PropositionalAbstraction(mapping)
+
+    def check(*formulas, k=0):
+        return abstraction.check(sum(1 << FORMULAS.index(f) for f in formulas), k)
+
+    assert check("a", "!a") == (MUCStatus.UNSATISFIABLE, None)
+    assert check("false") == (MUCStatus.UNSATISFIABLE, None)
+    assert check("a U b", "!a", "!b") == (MUCStatus.UNSATISFIABLE, None)
+    assert check("a R b", "!b") == (MUCStatus.UNSATISFIABLE, None)
+    assert check("a -> b", "a", "!b") == (MUCStatus.UNSATISFIABLE, None)
+    assert check("G(a)", "!a") == (MUCStatus.UNSATISFIABLE, None)
+    assert check("G(a)", "F(!a)") == (MUCStatus.UNKNOWN, None)
+    assert check("X(a)", "G(!a)") == (MUCStatus.UNKNOWN, None)
+    assert check("X(true)") == (MUCStatus.UNKNOWN, None)
+    assert check("F(a)", "a <-> b") == (MUCStatus.SATISFIABLE, 1)
+    # No witness of length 1 is searched for above horizon 0.
+    assert check("F(a)", "a <-> b", k=1) == (MUCStatus.UNKNOWN, None)
+
+
+def test_weak_next():
+    abstraction = PropositionalAbstraction(
+        ConjunctMapping.from_formula_string(formula_string(["WX(a)", "G(!a)"]))
+    )
+
+    assert abstraction.check(0b01) == (MUCStatus.SATISFIABLE, 1)
+    assert abstraction.check(0b11) == (MUCStatus.SATISFIABLE, 1)
+
+
+class UntillessAbstraction(PropositionalAbstraction):
+    def __rules__(self, f, n):
+        if isinstance(f, Until):
+            raise NotImplementedError(type(f).__name__)
+        return super().__rules__(f, n)
+
+
+def test_unsupported_conjuncts_are_unknown():
+    formulas = ["a", "!a", "a U b", "!b"]
+    abstraction = UntillessAbstraction(
+        ConjunctMapping.from_formula_string(formula_string(formulas))
+    )
+
+    assert abstraction.unsupported == 0b0100
+    assert not abstraction.supports(0b1110)
+    assert abstraction.check(0b1110) == (MUCStatus.UNKNOWN, None)
+    assert abstraction.check(0b0111) == (MUCStatus.UNKNOWN, None)
+    # The other conjuncts are still decided.
+    assert abstraction.check(0b0011) == (MUCStatus.UNSATISFIABLE, None)
+    assert abstraction.check(0b1001) == (MUCStatus.SATISFIABLE, 1)